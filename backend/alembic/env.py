@@ -13,7 +13,7 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 from app.database import Base
-from app.models import User, Activity, CV, Interview, Payment, Persona, Role, Screening, Transaction, UserProfile, UserRoleSelection, Wallet
+from app.models import User, Activity, AnalysisCache, CreditHold, CV, CVText, Interview, Payment, Persona, RefreshToken, RevokedToken, Role, Screening, ScreeningBatch, Transaction, UserCounter, UserProfile, UserRoleSelection, Wallet
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,52 @@
+"""Extend the keyset-paginated listing indexes with id
+
+Revision ID: 1b7d3f9a6c24
+Revises: f2a6c8e4b913
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7d3f9a6c24'
+down_revision: Union[str, Sequence[str], None] = 'f2a6c8e4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Listings page on (created_at, id); with id in the index the cursor
+# predicate and ORDER BY are served by the index alone, without a sort.
+TABLES = ['cvs', 'transactions', 'activities']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_user_id_created_at_id', table, ['user_id', 'created_at', 'id'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            # The new index covers every query the old prefix served
+            op.drop_index(
+                f'ix_{table}_user_id_created_at', table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_user_id_created_at', table, ['user_id', 'created_at'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(
+                f'ix_{table}_user_id_created_at_id', table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
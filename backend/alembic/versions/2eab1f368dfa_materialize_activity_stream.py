@@ -0,0 +1,53 @@
+"""Materialize the activity stream
+
+Revision ID: 2eab1f368dfa
+Revises: e41c76e3c2c1
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2eab1f368dfa'
+down_revision: Union[str, Sequence[str], None] = 'e41c76e3c2c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One-off fan-in over the source tables so existing users keep their history.
+BACKFILL_SQL = """
+INSERT INTO activities (user_id, kind, ref_id, message, created_at)
+SELECT user_id, 'transaction_' || type, id::text, initcap(type) || ' ' || credits || ' credits', created_at FROM transactions
+UNION ALL
+SELECT user_id, 'screening', id::text, 'CV screening ' || status, created_at FROM screenings
+UNION ALL
+SELECT user_id, 'interview', id::text, 'Interview ' || status, created_at FROM interviews
+UNION ALL
+SELECT user_id, 'role_selection', id::text, 'Updated role selection', created_at FROM user_role_selection
+UNION ALL
+SELECT user_id, 'cv_upload', id::text, left('Uploaded CV ' || filename, 255), created_at FROM cvs
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('activities', sa.Column('message', sa.String(length=255), nullable=True))
+    op.execute(BACKFILL_SQL)
+    op.execute("UPDATE activities SET message = 'Profile updated' WHERE kind = 'profile_update' AND message IS NULL")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_activities_user_id_created_at', 'activities', ['user_id', 'created_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_activities_user_id_created_at', table_name='activities', postgresql_concurrently=True, if_exists=True)
+    op.execute("DELETE FROM activities WHERE kind <> 'profile_update'")
+    op.drop_column('activities', 'message')
@@ -0,0 +1,46 @@
+"""Add job queue columns to screenings
+
+Revision ID: 6705f45f665e
+Revises: 2eab1f368dfa
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6705f45f665e'
+down_revision: Union[str, Sequence[str], None] = '2eab1f368dfa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('screenings', sa.Column('progress', sa.String(length=50), nullable=True))
+    op.add_column('screenings', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('screenings', sa.Column('analysis', sa.Text(), nullable=True))
+    op.add_column('screenings', sa.Column('error', sa.Text(), nullable=True))
+    op.add_column('screenings', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('screenings', sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_screenings_pending_created_at', 'screenings', ['created_at'],
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_screenings_pending_created_at', table_name='screenings', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('screenings', 'finished_at')
+    op.drop_column('screenings', 'started_at')
+    op.drop_column('screenings', 'error')
+    op.drop_column('screenings', 'analysis')
+    op.drop_column('screenings', 'attempts')
+    op.drop_column('screenings', 'progress')
@@ -0,0 +1,28 @@
+"""Add run_after to screenings for retry backoff
+
+Revision ID: 8c4e2a7d5b16
+Revises: 1b7d3f9a6c24
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2a7d5b16'
+down_revision: Union[str, Sequence[str], None] = '1b7d3f9a6c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('screenings', sa.Column('run_after', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('screenings', 'run_after')
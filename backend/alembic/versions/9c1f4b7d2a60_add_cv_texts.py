@@ -0,0 +1,43 @@
+"""Add cv_texts for stored CV extractions
+
+Revision ID: 9c1f4b7d2a60
+Revises: 6705f45f665e
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f4b7d2a60'
+down_revision: Union[str, Sequence[str], None] = '6705f45f665e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cv_texts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('cv_id', sa.Integer(), nullable=False),
+    sa.Column('content_key', sa.String(length=128), nullable=False),
+    sa.Column('extractor_version', sa.String(length=20), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('char_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['cv_id'], ['cvs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cv_id')
+    )
+    op.create_index(op.f('ix_cv_texts_content_key'), 'cv_texts', ['content_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cv_texts_content_key'), table_name='cv_texts')
+    op.drop_table('cv_texts')
@@ -0,0 +1,49 @@
+"""Add screening_batches and screenings.batch_id
+
+Revision ID: d7a2c9e0b415
+Revises: b3e8d51c7f24
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c9e0b415'
+down_revision: Union[str, Sequence[str], None] = 'b3e8d51c7f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('screening_batches',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('credits_used', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_screening_batches_user_id'), 'screening_batches', ['user_id'], unique=False)
+    op.add_column('screenings', sa.Column('batch_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('screenings_batch_id_fkey', 'screenings', 'screening_batches', ['batch_id'], ['id'])
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_screenings_batch_id'), 'screenings', ['batch_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_screenings_batch_id'), table_name='screenings', postgresql_concurrently=True, if_exists=True)
+    op.drop_constraint('screenings_batch_id_fkey', 'screenings', type_='foreignkey')
+    op.drop_column('screenings', 'batch_id')
+    op.drop_index(op.f('ix_screening_batches_user_id'), table_name='screening_batches')
+    op.drop_table('screening_batches')
@@ -0,0 +1,44 @@
+"""Add (user_id, created_at) indexes for user-scoped listings
+
+Revision ID: e41c76e3c2c1
+Revises: 33530fcee3dd
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41c76e3c2c1'
+down_revision: Union[str, Sequence[str], None] = '33530fcee3dd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_cvs_user_id_created_at', 'cvs'),
+    ('ix_interviews_user_id_created_at', 'interviews'),
+    ('ix_transactions_user_id_created_at', 'transactions'),
+    ('ix_screenings_user_id_created_at', 'screenings'),
+    ('ix_user_role_selection_user_id_created_at', 'user_role_selection'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.create_index(
+                name, table, ['user_id', 'created_at'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,50 @@
+"""Add credit_holds and screenings.hold_id
+
+Revision ID: e83b5d6f2a17
+Revises: c6e1f0a9d372
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b5d6f2a17'
+down_revision: Union[str, Sequence[str], None] = 'c6e1f0a9d372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('credit_holds',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('credits', sa.Integer(), nullable=False),
+    sa.Column('captured_credits', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('released_credits', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('external_ref', sa.String(length=255), nullable=True),
+    sa.Column('payment_gateway', sa.String(length=50), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('settled_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_credit_holds_user_id'), 'credit_holds', ['user_id'], unique=False)
+    op.create_index('ix_credit_holds_held_expires_at', 'credit_holds', ['expires_at'], unique=False, postgresql_where=sa.text("status = 'held'"))
+    op.add_column('screenings', sa.Column('hold_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('screenings_hold_id_fkey', 'screenings', 'credit_holds', ['hold_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('screenings_hold_id_fkey', 'screenings', type_='foreignkey')
+    op.drop_column('screenings', 'hold_id')
+    op.drop_index('ix_credit_holds_held_expires_at', table_name='credit_holds', postgresql_where=sa.text("status = 'held'"))
+    op.drop_index(op.f('ix_credit_holds_user_id'), table_name='credit_holds')
+    op.drop_table('credit_holds')
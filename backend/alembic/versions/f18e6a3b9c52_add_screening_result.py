@@ -0,0 +1,28 @@
+"""Add screenings.result
+
+Revision ID: f18e6a3b9c52
+Revises: d7a2c9e0b415
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f18e6a3b9c52'
+down_revision: Union[str, Sequence[str], None] = 'd7a2c9e0b415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('screenings', sa.Column('result', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('screenings', 'result')
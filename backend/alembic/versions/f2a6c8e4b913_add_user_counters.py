@@ -0,0 +1,42 @@
+"""Add user_counters for list totals
+
+Revision ID: f2a6c8e4b913
+Revises: e83b5d6f2a17
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c8e4b913'
+down_revision: Union[str, Sequence[str], None] = 'e83b5d6f2a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cv_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('transaction_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute("""
+        INSERT INTO user_counters (user_id, cv_count, transaction_count)
+        SELECT users.id,
+               (SELECT count(*) FROM cvs WHERE cvs.user_id = users.id),
+               (SELECT count(*) FROM transactions WHERE transactions.user_id = users.id)
+        FROM users
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_counters')
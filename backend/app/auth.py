@@ -2,6 +2,7 @@ from datetime import datetime,timedelta,timezone
 from jose import jwt,JWTError
 from passlib.context import CryptContext
 import os
+import uuid
 
 
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -14,6 +15,8 @@ def create_access_token(data:dict,expires_delta:timedelta | None=None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=15))
     to_encode.update({"exp":expire})
+    # Token id, so a single token can be revoked before it expires
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     return jwt.encode(to_encode,SECRET_KEY,algorithm=ALGORITHM)
 
 def decode_token(token:str):
@@ -39,10 +42,23 @@ def decode_refresh_token(token: str):
         return None
 
 
-pwd_context = CryptContext(schemes=["bcrypt"],deprecated="auto")
+# bcrypt cost factor; hashes made with any other cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 def hash_password(password:str)->str:
     return pwd_context.hash(password)
 
 def verify_password(plain:str,hashed:str) -> bool:
     return pwd_context.verify(plain,hashed)
+
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify, and return a new hash when the stored one uses an outdated cost."""
+    return pwd_context.verify_and_update(plain, hashed)
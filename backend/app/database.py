@@ -1,20 +1,76 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
+from app.db_metrics import PoolStats, instrumented_pool_class, install_slow_query_log, pool_status
+
 
- 
 Base = declarative_base()
 
-load_dotenv() 
+load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _async_database_url(url: str) -> str:
+    """Swap the sync psycopg2 driver in DATABASE_URL for asyncpg."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgresql+psycopg2", "postgres"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+# The sync engine only serves migrations, startup DDL and scripts.
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", 2))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+DB_SLOW_QUERY_SAMPLE_RATE = float(os.getenv("DB_SLOW_QUERY_SAMPLE_RATE", 1.0))
+
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
+# Sync engine is kept for Alembic, create_all and scripts.
+engine = create_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_stats),
+    pool_size=DB_SYNC_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Request handlers use the async engine so DB I/O never blocks the event loop.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_stats),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+)
+
+install_slow_query_log(engine, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_SAMPLE_RATE)
+install_slow_query_log(async_engine.sync_engine, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_SAMPLE_RATE)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def create_db_and_tables():
     Base.metadata.create_all(engine)
 
@@ -24,3 +80,13 @@ def get_session():
         yield db
     finally:
         db.close()
+
+def get_pool_stats() -> dict:
+    return {
+        "async": pool_status(async_engine.sync_engine, async_pool_stats),
+        "sync": pool_status(engine, sync_pool_stats),
+    }
+
+async def get_async_session():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,118 @@
+import json
+import logging
+import random
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+class PoolStats:
+    """Counters for connection checkouts on one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            if waited > self.max_wait_seconds:
+                self.max_wait_seconds = waited
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+            self.total_wait_seconds += waited
+            if waited > self.max_wait_seconds:
+                self.max_wait_seconds = waited
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+def instrumented_pool_class(base, stats: PoolStats):
+    """Subclass a QueuePool flavour so every checkout is timed into `stats`.
+
+    Pool.recreate() (used by engine.dispose()) instantiates self.__class__,
+    so the counters survive a dispose.
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except sa_exc.TimeoutError:
+                stats.record_timeout(time.perf_counter() - start)
+                raise
+            stats.record_checkout(time.perf_counter() - start)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def pool_status(engine: Engine, stats: PoolStats) -> dict:
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    status.update(stats.snapshot())
+    return status
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, sample_rate: float) -> None:
+    """Log statements slower than `threshold_ms` as one JSON line each.
+
+    Only a `sample_rate` fraction of slow statements is written so a
+    degraded database cannot turn the log into a second bottleneck.
+    Bound parameters are never logged.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_if_slow(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed_ms, 2),
+            "threshold_ms": threshold_ms,
+            "rowcount": getattr(cursor, "rowcount", None),
+            "executemany": executemany,
+            "statement": " ".join(statement.split())[:2000],
+        }))
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
@@ -1,20 +1,47 @@
+import os
 from fastapi import Depends,HTTPException
 from typing import Annotated
-from sqlalchemy.orm import Session
-from app.database import get_session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_session
 from fastapi.security import OAuth2PasswordBearer
 from app.auth import decode_token
 from app.models.user_model import User
+from app.user_cache import CurrentUser, user_cache
+from app.services.token_revocation import token_revocations
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+# Operators allowed to read internal stats (pool and cache health)
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
-def get_curr_user(token:Annotated[str,Depends(oauth2_scheme)],session:SessionDep):
+async def get_curr_user(token:Annotated[str,Depends(oauth2_scheme)],session:SessionDep) -> CurrentUser:
     payload = decode_token(token)
     if not payload:
         raise HTTPException(status_code=401,detail="User not found")
-    user = session.query(User).filter(User.email == payload.get("sub")).first()
-    if not user:
+    jti = payload.get("jti")
+    if jti and token_revocations.is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    subject = payload.get("sub")
+    cached = user_cache.get(subject)
+    if cached:
+        return cached
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = await session.get(User, user_id)
+    else:
+        # Tokens issued before the uid claim existed
+        user = await session.scalar(select(User).where(User.email == subject))
+    if not user or user.email != subject:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    return user_cache.put(user)
+
+async def get_admin_user(current_user: Annotated[CurrentUser, Depends(get_curr_user)]) -> CurrentUser:
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
@@ -0,0 +1,71 @@
+"""Application-wide outbound HTTP client.
+
+One pooled ``httpx.AsyncClient`` is shared by every integration (GitHub
+Models, Tavus, OAuth providers) so connections and TLS sessions are
+reused. Known provider hosts get their own connection pool capped at
+HTTP_MAX_CONNECTIONS_PER_HOST; HTTP/2 is used when ``h2`` is installed.
+The client is opened in the app lifespan and closed on shutdown.
+"""
+import os
+from typing import Optional
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 30))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", 5))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 20))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", 60))
+
+PROVIDER_HOSTS = [
+    "models.github.ai",
+    "tavusapi.com",
+    "oauth2.googleapis.com",
+    "www.googleapis.com",
+    "accounts.google.com",
+    "www.linkedin.com",
+    "api.linkedin.com",
+    "login.microsoftonline.com",
+    "graph.microsoft.com",
+]
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _transport(max_connections: int) -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+        transport=_transport(HTTP_MAX_CONNECTIONS),
+        mounts={f"https://{host}": _transport(HTTP_MAX_CONNECTIONS_PER_HOST) for host in PROVIDER_HOSTS},
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client; created on first use outside the app lifespan (e.g. CLI workers)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,12 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from app.database import engine, Base
-from app.routes import auth_router, profile_router, roles_router, cv_router, payment_router, screening_router, interview_router, activity_router
+from app.database import engine, async_engine, Base
+from app.http_client import get_http_client, close_http_client
+from app.services.extraction_pool import extraction_pool
+from app.services.password_pool import password_pool
+from app.services.refresh_tokens import sweep_refresh_tokens_forever
+from app.services.role_catalog import role_catalog
+from app.services.token_revocation import token_revocations
+from app.services.wallet_ledger import sweep_holds_forever
+from app.services.screening_worker import screening_workers, SCREENING_WORKERS
+from app.routes import auth_router, profile_router, roles_router, cv_router, payment_router, screening_router, interview_router, activity_router, health_router
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Student Interview App API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_http_client()
+    if SCREENING_WORKERS > 0:
+        screening_workers.start()
+    await token_revocations.sync()
+    await role_catalog.seed_defaults()
+    await role_catalog.load()
+    background = [
+        asyncio.create_task(sweep_refresh_tokens_forever()),
+        asyncio.create_task(token_revocations.sync_forever()),
+        asyncio.create_task(sweep_holds_forever()),
+        asyncio.create_task(role_catalog.refresh_forever()),
+    ]
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await screening_workers.stop()
+    extraction_pool.shutdown()
+    password_pool.shutdown()
+    await close_http_client()
+    await async_engine.dispose()
+
+app = FastAPI(title="Student Interview App API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(SessionMiddleware, secret_key="your-secret-key-change-in-production")
 
@@ -26,6 +60,7 @@ app.include_router(payment_router, prefix="/api/v1", tags=["Payments & Wallet"])
 app.include_router(screening_router, prefix="/api/v1/screenings", tags=["Screenings"])
 app.include_router(interview_router, prefix="/api/v1/interviews", tags=["Interviews"])
 app.include_router(activity_router, prefix="/api/v1", tags=["Activity"])
+app.include_router(health_router, prefix="/api/v1", tags=["Health"])
 
 @app.get("/")
 def read_root():
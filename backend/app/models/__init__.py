@@ -1,13 +1,20 @@
 # Import all models here to make them available from app.models
 from .user_model import User
 from .activity_model import Activity
+from .analysis_cache_model import AnalysisCache
+from .credit_hold_model import CreditHold
 from .cv_model import CV
+from .cv_text_model import CVText
 from .interview_model import Interview
 from .payment_model import Payment
 from .persona_model import Persona
+from .refresh_token_model import RefreshToken
+from .revoked_token_model import RevokedToken
 from .role_model import Role
 from .screening_model import Screening
+from .screening_batch_model import ScreeningBatch
 from .transaction_model import Transaction
+from .user_counter_model import UserCounter
 from .user_profiles_model import UserProfile
 from .user_role_selection_model import UserRoleSelection
 from .wallet_model import Wallet
@@ -17,13 +24,20 @@ from .wallet_model import Wallet
 __all__ = [
     "User",
     "Activity",
+    "AnalysisCache",
+    "CreditHold",
     "CV",
+    "CVText",
     "Interview",
     "Payment",
     "Persona",
+    "RefreshToken",
+    "RevokedToken",
     "Role",
     "Screening",
+    "ScreeningBatch",
     "Transaction",
+    "UserCounter",
     "UserProfile",
     "UserRoleSelection",
     "Wallet",
@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index('ix_activities_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    kind = Column(String(50), nullable=False)  # upload|interview_start|screening|login|profile_update
+    kind = Column(String(50), nullable=False)  # cv_upload|screening|interview|role_selection|transaction_<type>|profile_update
     # Use string to store flexible reference identifiers (e.g., order ids, composed keys)
     ref_id = Column(String(255), nullable=True)
+    message = Column(String(255), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AnalysisCache(Base):
+    __tablename__ = "analysis_cache"
+    __table_args__ = (
+        UniqueConstraint('text_hash', 'model', 'prompt_version', 'temperature', name='uq_analysis_cache_key'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # sha256 of the normalized CV text exactly as it is sent to the model
+    text_hash = Column(String(64), nullable=False)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    temperature = Column(Float, nullable=False)
+    analysis = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<AnalysisCache(id={self.id}, model='{self.model}', prompt_version='{self.prompt_version}', hit_count={self.hit_count})>"
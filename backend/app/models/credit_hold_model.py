@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class CreditHold(Base):
+    __tablename__ = "credit_holds"
+    __table_args__ = (
+        # Expiry sweep: only open holds are indexed
+        Index('ix_credit_holds_held_expires_at', 'expires_at', postgresql_where=text("status = 'held'")),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Taken from the wallet when the hold was placed; still held is
+    # credits - captured_credits - released_credits
+    credits = Column(Integer, nullable=False)
+    captured_credits = Column(Integer, default=0, server_default="0", nullable=False)
+    released_credits = Column(Integer, default=0, server_default="0", nullable=False)
+    status = Column(String(20), nullable=False)  # held|settled|expired
+    external_ref = Column(String(255), nullable=True)
+    payment_gateway = Column(String(50), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    settled_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<CreditHold(id={self.id}, user_id={self.user_id}, credits={self.credits}, status='{self.status}')>"
@@ -4,6 +4,10 @@ from app.database import Base
 
 class CV(Base):
     __tablename__ = "cvs"
+    __table_args__ = (
+        # id breaks created_at ties for keyset pages (app.pagination)
+        Index('ix_cvs_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,8 +22,3 @@ class CV(Base):
     
     def __repr__(self):
         return f"<CV(id={self.id}, filename='{self.filename}', user_id={self.user_id}, status='{self.status})>"
-
-# Add indexes
-__table_args__ = (
-    Index('ix_cvs_user_id_created_at', 'user_id', 'created_at'),
-)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class CVText(Base):
+    __tablename__ = "cv_texts"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cv_id = Column(Integer, ForeignKey("cvs.id", ondelete="CASCADE"), unique=True, nullable=False)
+    # "etag:<etag>" from storage, or "sha256:<hex>" when no ETag is available
+    content_key = Column(String(128), nullable=False, index=True)
+    extractor_version = Column(String(20), nullable=False)
+    text = Column(Text, nullable=False)
+    page_count = Column(Integer, nullable=True)
+    char_count = Column(Integer, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<CVText(cv_id={self.cv_id}, content_key='{self.content_key}', extractor_version='{self.extractor_version}')>"
@@ -4,6 +4,9 @@ from app.database import Base
 
 class Interview(Base):
     __tablename__ = "interviews"
+    __table_args__ = (
+        Index('ix_interviews_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -16,8 +19,3 @@ class Interview(Base):
     
     def __repr__(self):
         return f"<Interview(id={self.id}, user_id={self.user_id}, role_id={self.role_id}, status='{self.status}', credits_used={self.credits_used})>"
-
-# Add indexes  
-__table_args__ = (
-    Index('ix_interviews_user_id_created_at', 'user_id', 'created_at'),
-)
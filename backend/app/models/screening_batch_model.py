@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScreeningBatch(Base):
+    __tablename__ = "screening_batches"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Who requested (and paid for) the batch; items belong to the CV owners
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    total = Column(Integer, nullable=False)
+    credits_used = Column(Integer, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ScreeningBatch(id={self.id}, user_id={self.user_id}, total={self.total})>"
@@ -1,17 +1,36 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, JSON, Text, text
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Screening(Base):
     __tablename__ = "screenings"
-    
+    __table_args__ = (
+        Index('ix_screenings_user_id_created_at', 'user_id', 'created_at'),
+        # Queue scan for workers: only pending rows are indexed
+        Index('ix_screenings_pending_created_at', 'created_at', postgresql_where=text("status = 'pending'")),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
-    status = Column(String(50), nullable=False)  # pending|done|failed
+    batch_id = Column(Integer, ForeignKey("screening_batches.id"), nullable=True, index=True)
+    # Credits are held here until the screening succeeds (captured) or fails (released)
+    hold_id = Column(Integer, ForeignKey("credit_holds.id"), nullable=True)
+    status = Column(String(50), nullable=False)  # pending|running|done|failed
+    progress = Column(String(50), nullable=True)  # queued|extracting|analyzing
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
     credits_used = Column(Integer, default=1, nullable=False)
-    
+    # Always call the model, even if an identical analysis is cached
+    bypass_cache = Column(Boolean, default=False, server_default="false", nullable=False)
+    analysis = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)  # validated ScreeningResult
+    error = Column(Text, nullable=True)
+    # Earliest time a requeued attempt may be claimed again
+    run_after = Column(DateTime(timezone=True), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
     def __repr__(self):
         return f"<Screening(id={self.id}, user_id={self.user_id}, cv_id={self.cv_id}, status='{self.status}', credits_used={self.credits_used})>"
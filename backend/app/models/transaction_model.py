@@ -4,6 +4,9 @@ from app.database import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index('ix_transactions_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,7 +22,3 @@ class Transaction(Base):
     
     def __repr__(self):
         return f"<Transaction(id={self.id}, user_id={self.user_id}, type='{self.type}', credits={self.credits}, status='{self.status}')>"
-
-__table_args__ = (
-    Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
-)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class UserCounter(Base):
+    __tablename__ = "user_counters"
+    
+    # Kept apart from users so counting writes never touch the users row
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    cv_count = Column(Integer, default=0, server_default="0", nullable=False)
+    transaction_count = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<UserCounter(user_id={self.user_id}, cv_count={self.cv_count}, transaction_count={self.transaction_count})>"
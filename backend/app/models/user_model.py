@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Index
+from sqlalchemy import Column, Integer, String
 from app.database import Base
 
 class User(Base):
@@ -13,7 +13,3 @@ class User(Base):
     
     def __repr__(self):
         return f"<User(id={self.id}, name='{self.name}', email='{self.email}')>"
-
-__table_args__ = (
-    Index('ix_users_email', 'email'),
-)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 class UserRoleSelection(Base):
     __tablename__ = "user_role_selection"
+    __table_args__ = (
+        Index('ix_user_role_selection_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
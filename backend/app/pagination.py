@@ -0,0 +1,48 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``, newest first.
+
+Each page is one index range scan that starts where the previous page
+ended, so page 1000 costs the same as page 1, and rows inserted while a
+client pages through never shift or repeat results the way OFFSET does.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_LIMIT = 100
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_stmt(stmt: Select, model, limit: int, cursor: Optional[str] = None) -> Select:
+    """``stmt`` narrowed to the page after ``cursor``, fetching one extra row to detect a next page."""
+    if cursor:
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor)))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+async def keyset_page(
+    session: AsyncSession, stmt: Select, model, limit: int, cursor: Optional[str] = None
+) -> tuple[list, Optional[str]]:
+    """Return one page of ``stmt`` (selecting ``model``) and the cursor for the next one."""
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    rows = (await session.scalars(keyset_stmt(stmt, model, limit, cursor))).all()
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = rows[:limit]
+    return list(rows), encode_cursor(rows[-1].created_at, rows[-1].id)
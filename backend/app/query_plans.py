@@ -0,0 +1,163 @@
+"""Check that the hot queries are planned as index scans.
+
+``python -m app.query_plans`` seeds a few thousand users' worth of rows
+inside one transaction, runs ``ANALYZE``, then ``EXPLAIN``s each hot
+query and exits non-zero if one stops using its index (for example
+because an index was dropped, renamed, or declared where SQLAlchemy never
+sees it). The transaction is rolled back, so it is safe against any
+database the app can reach.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Select, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, async_engine
+from app.models.activity_model import Activity
+from app.models.cv_model import CV
+from app.models.interview_model import Interview
+from app.models.screening_model import Screening
+from app.models.transaction_model import Transaction
+from app.models.user_role_selection_model import UserRoleSelection
+from app.pagination import encode_cursor, keyset_stmt
+from app.services.screening_worker import next_pending_screening_stmt
+
+SEED_SQL = [
+    """
+    INSERT INTO users (name, email, password)
+    SELECT 'Plan check', 'plan-check-' || g || '-' || :tag || '@example.invalid', '!'
+    FROM generate_series(1, :users) g
+    """,
+    "INSERT INTO roles (title, description, is_active) VALUES ('Plan check', 'Plan check', true)",
+    """
+    INSERT INTO cvs (user_id, filename, mime_type, size_bytes, storage_url, status, created_at)
+    SELECT u.id, 'cv-' || g || '.pdf', 'application/pdf', 1024, 'plan-check/' || u.id || '/' || g, 'uploaded',
+           now() - make_interval(mins => g * 7 + u.id % 5)
+    FROM users u CROSS JOIN generate_series(1, :per_user) g WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO transactions (user_id, type, credits, status, created_at)
+    SELECT u.id, 'deduct', 1, 'completed', now() - make_interval(mins => g * 3 + u.id % 5)
+    FROM users u CROSS JOIN generate_series(1, :per_user) g WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO activities (user_id, kind, message, created_at)
+    SELECT u.id, 'screening', 'CV screening done', now() - make_interval(mins => g * 2 + u.id % 5)
+    FROM users u CROSS JOIN generate_series(1, :per_user) g WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO user_role_selection (user_id, role_id, created_at)
+    SELECT u.id, (SELECT max(id) FROM roles), now() - make_interval(mins => g)
+    FROM users u CROSS JOIN generate_series(1, 3) g WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO interviews (user_id, role_id, status, credits_used, created_at)
+    SELECT u.id, (SELECT max(id) FROM roles), 'done', 5, now() - make_interval(mins => g * 11 + u.id % 5)
+    FROM users u CROSS JOIN generate_series(1, :per_user) g WHERE u.email LIKE :pattern
+    """,
+    # Nearly every screening is finished; workers only ever look for the few pending ones
+    """
+    INSERT INTO screenings (user_id, cv_id, status, credits_used, created_at)
+    SELECT cvs.user_id, cvs.id, CASE WHEN cvs.id % 500 = 0 THEN 'pending' ELSE 'done' END, 1, cvs.created_at
+    FROM cvs JOIN users u ON u.id = cvs.user_id WHERE u.email LIKE :pattern
+    """,
+]
+
+ANALYZED_TABLES = ["users", "roles", "cvs", "transactions", "activities", "user_role_selection", "interviews", "screenings"]
+
+
+def hot_queries(user_id: int) -> list[tuple[str, Select, str]]:
+    """(name, statement, index it must use), built the way the routes build them."""
+    cursor = encode_cursor(datetime.now(timezone.utc) - timedelta(hours=1), 2**31 - 1)
+    return [
+        ("cv list", keyset_stmt(select(CV).where(CV.user_id == user_id), CV, 10), "ix_cvs_user_id_created_at_id"),
+        ("cv list, next page", keyset_stmt(select(CV).where(CV.user_id == user_id), CV, 10, cursor), "ix_cvs_user_id_created_at_id"),
+        (
+            "transaction list",
+            keyset_stmt(select(Transaction).where(Transaction.user_id == user_id), Transaction, 10, cursor),
+            "ix_transactions_user_id_created_at_id",
+        ),
+        (
+            "wallet recent transactions",
+            select(Transaction).where(Transaction.user_id == user_id).order_by(Transaction.created_at.desc()).limit(5),
+            "ix_transactions_user_id_created_at_id",
+        ),
+        (
+            "activity feed",
+            keyset_stmt(select(Activity).where(Activity.user_id == user_id), Activity, 20, cursor),
+            "ix_activities_user_id_created_at_id",
+        ),
+        (
+            "role selections",
+            select(UserRoleSelection).where(UserRoleSelection.user_id == user_id),
+            "ix_user_role_selection_user_id_created_at",
+        ),
+        (
+            "interview history",
+            keyset_stmt(select(Interview).where(Interview.user_id == user_id), Interview, 10, cursor),
+            "ix_interviews_user_id_created_at",
+        ),
+        (
+            "screening history",
+            keyset_stmt(select(Screening).where(Screening.user_id == user_id), Screening, 10, cursor),
+            "ix_screenings_user_id_created_at",
+        ),
+        ("screening queue claim", next_pending_screening_stmt(), "ix_screenings_pending_created_at"),
+    ]
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def explain(session: AsyncSession, stmt: Select) -> dict:
+    compiled = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    raw = await session.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+async def check_plans(users: int, per_user: int, verbose: bool) -> bool:
+    tag = uuid.uuid4().hex[:8]
+    params = {"tag": tag, "users": users, "per_user": per_user, "pattern": f"plan-check-%-{tag}@example.invalid"}
+    ok = True
+    async with AsyncSessionLocal() as session:
+        try:
+            for sql in SEED_SQL:
+                await session.execute(text(sql), params)
+            for table in ANALYZED_TABLES:
+                await session.execute(text(f"ANALYZE {table}"))
+            user_id = await session.scalar(
+                text("SELECT id FROM users WHERE email = :email"),
+                {"email": f"plan-check-{users // 2}-{tag}@example.invalid"},
+            )
+
+            for name, stmt, index in hot_queries(user_id):
+                plan = await explain(session, stmt)
+                nodes = list(_plan_nodes(plan))
+                used = {n["Index Name"] for n in nodes if "Index Name" in n}
+                seq_scans = {n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"}
+                passed = index in used and stmt.get_final_froms()[0].name not in seq_scans
+                ok = ok and passed
+                print(f"{'OK  ' if passed else 'FAIL'} {name}: expected {index}, used {sorted(used) or 'no index'}"
+                      + (f", seq scan on {sorted(seq_scans)}" if seq_scans else ""))
+                if verbose or not passed:
+                    print(json.dumps(plan, indent=2))
+        finally:
+            await session.rollback()
+    await async_engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries against seeded data")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--per-user", type=int, default=20)
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(check_plans(args.users, args.per_user, args.verbose)) else 1)
@@ -6,6 +6,7 @@ from .payment_routes import router as payment_router
 from .screening_routes import router as screening_router
 from .interview_routes import router as interview_router
 from .activity_routes import router as activity_router
+from .health_routes import router as health_router
 
 __all__ = [
     "auth_router",
@@ -16,6 +17,7 @@ __all__ = [
     "screening_router",
     "interview_router",
     "activity_router",
+    "health_router",
 ]
 
 
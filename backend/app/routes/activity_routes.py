@@ -1,58 +1,43 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Annotated, List
-from sqlalchemy.orm import Session
-from app.dependencies import SessionDep, get_curr_user
-from app.models.user_model import User
-from app.models.transaction_model import Transaction
-from app.models.screening_model import Screening
-from app.models.interview_model import Interview
-from app.models.user_role_selection_model import UserRoleSelection
-from app.models.cv_model import CV
+from typing import Annotated, Optional
+from sqlalchemy import select
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.models.activity_model import Activity
+from app.pagination import keyset_page
 
 router = APIRouter()
 
+# Fallback text for rows written before activities carried a message
+DEFAULT_MESSAGES = {
+    "profile_update": "Profile updated",
+    "role_selection": "Updated role selection",
+}
+
+
 @router.get("/activities")
-def get_recent_activities(current_user: Annotated[User, Depends(get_curr_user)], session: SessionDep, limit: int = 20):
+async def get_recent_activities(
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+):
     try:
-        items = []
-        # Transactions
-        for t in session.query(Transaction).filter(Transaction.user_id == current_user.id).all():
-            items.append({
-                "type": f"transaction_{t.type}",
-                "message": f"{t.type.capitalize()} {t.credits} credits",
-                "created_at": t.created_at,
-            })
-        # Screenings
-        for s in session.query(Screening).filter(Screening.user_id == current_user.id).all():
-            items.append({
-                "type": "screening",
-                "message": f"CV screening {s.status}",
-                "created_at": s.created_at,
-            })
-        # Interviews
-        for iv in session.query(Interview).filter(Interview.user_id == current_user.id).all():
-            items.append({
-                "type": "interview",
-                "message": f"Interview {iv.status}",
-                "created_at": iv.created_at,
-            })
-        # Role selections
-        for rs in session.query(UserRoleSelection).filter(UserRoleSelection.user_id == current_user.id).all():
-            items.append({
-                "type": "role_selection",
-                "message": "Updated role selection",
-                "created_at": rs.created_at,
-            })
-        # CV uploads
-        for cv in session.query(CV).filter(CV.user_id == current_user.id).all():
-            items.append({
-                "type": "cv_upload",
-                "message": f"Uploaded CV {cv.filename}",
-                "created_at": cv.created_at,
-            })
-
-        # Sort by created_at desc and cap limit
-        items.sort(key=lambda x: x["created_at"] or 0, reverse=True)
-        return {"activities": items[:limit]}
+        # Single range scan on ix_activities_user_id_created_at_id
+        rows, next_cursor = await keyset_page(
+            session, select(Activity).where(Activity.user_id == current_user.id), Activity, limit, cursor
+        )
+        return {
+            "activities": [
+                {
+                    "type": a.kind,
+                    "message": a.message or DEFAULT_MESSAGES.get(a.kind, a.kind.replace("_", " ").capitalize()),
+                    "created_at": a.created_at,
+                }
+                for a in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get activities: {str(e)}")
@@ -2,28 +2,35 @@ from fastapi import  Depends, HTTPException, APIRouter, Request
 from typing import Annotated, List
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.models.user_profiles_model import UserProfile
 from app.models.wallet_model import Wallet
-from app.models.activity_model import Activity
 from app.models.role_model import Role
 from app.models.user_role_selection_model import UserRoleSelection
 from app.models.transaction_model import Transaction
-from app.auth import create_access_token, create_refresh_token, decode_refresh_token, hash_password, verify_password
+from app.auth import create_access_token, decode_refresh_token, decode_token
 from app.schemas import (
     CreateUser, Token, WalletResponse, RefreshRequest
 )
 from fastapi.responses import Response
 import json
-from app.dependencies import SessionDep, get_curr_user
-from datetime import timedelta
+from app.dependencies import SessionDep, get_curr_user, optional_oauth2_scheme
+from app.services.activity_stream import record_activity
+from app.services.oidc import google_oidc, microsoft_oidc
+from app.services.password_pool import password_pool
+from app.services.token_revocation import token_revocations
+from app.services.refresh_tokens import REFRESH_TOKEN_EXPIRE_DAYS, issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from app.http_client import get_http_client
+from datetime import datetime, timedelta, timezone
 from google.auth.transport import requests as google_requests
 from authlib.integrations.starlette_client import OAuth
 import os
-import httpx
+import asyncio
 import secrets
 import string
+from urllib.parse import urlencode
 
 router = APIRouter()
 
@@ -79,61 +86,82 @@ oauth.register(
     }
 )
 
-def create_complete_user_setup(session: Session, user: User) -> None:
-    try:
-        user_profile = UserProfile(
-            user_id=user.id,
-            full_name=user.name,
-            phone=user.phone,
-            city=user.city
-        )
-        session.add(user_profile)
-        wallet = Wallet(user_id=user.id, balance_credits=0)
-        session.add(wallet)
-        activity = Activity(
-            user_id=user.id,
-            kind="profile_update",
-            ref_id=f"user_registration_{user.id}"
-        )
-        session.add(activity)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to create user setup: {str(e)}")
+async def create_complete_user_setup(session: AsyncSession, user: User) -> None:
+    """Add the profile, wallet and first activity for a flushed user; the caller commits."""
+    user_profile = UserProfile(
+        user_id=user.id,
+        full_name=user.name,
+        phone=user.phone,
+        city=user.city
+    )
+    session.add(user_profile)
+    wallet = Wallet(user_id=user.id, balance_credits=0)
+    session.add(wallet)
+    record_activity(
+        session,
+        user.id,
+        kind="profile_update",
+        message="Account created",
+        ref_id=f"user_registration_{user.id}"
+    )
 
 
-def _issue_tokens_response(session: Session, user: User) -> Response:
-    expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access = create_access_token(data={"sub": user.email}, expires_delta=expire)
-    refresh = create_refresh_token(data={"sub": user.email})
-     
-    user.refresh_token = refresh
-    session.add(user)
-    session.commit()
+async def _oauth_login_redirect(session: AsyncSession, request: Request, email: str, name: str) -> RedirectResponse:
+    """Sign in an OAuth user, creating the account on first login.
 
-    response_data = {"access_token": access, "token_type": "bearer"}
-    response = Response(content=json.dumps(response_data), media_type="application/json")
+    The user, its setup rows and the issued refresh token are written in
+    a single transaction.
+    """
+    user = await session.scalar(select(User).where(User.email == email))
+    if not user:
+        random_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
+        hashed_password = await password_pool.hash(random_password)
+        user = User(name=name, email=email, password=hashed_password, city=None)
+        session.add(user)
+        await session.flush()
+        await create_complete_user_setup(session, user)
+    tokens = await _issue_tokens_data(session, user, _device_label(request))
+    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
+    query = urlencode({"token": tokens["access_token"], "name": name})
+    response = RedirectResponse(url=f"{frontend_url}/auth/callback?{query}")
+    _set_refresh_cookie(response, tokens["refresh_token"])
+    return response
+
+
+def _device_label(request: Request) -> str | None:
+    return request.headers.get("user-agent")
+
+
+def _set_refresh_cookie(response: Response, refresh: str) -> None:
     response.set_cookie(
         key="refresh_token",
         value=refresh,
         httponly=True,
         secure=True,
         samesite="strict",
-        max_age=7 * 24 * 60 * 60,
+        max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
         path="/api/v1/auth/refresh"
     )
+
+
+async def _issue_tokens_response(
+    session: AsyncSession, user: User, device_label: str | None, family_id: str | None = None
+) -> Response:
+    tokens = await _issue_tokens_data(session, user, device_label, family_id)
+    response_data = {"access_token": tokens["access_token"], "token_type": "bearer"}
+    response = Response(content=json.dumps(response_data), media_type="application/json")
+    _set_refresh_cookie(response, tokens["refresh_token"])
     return response
 
-def _issue_tokens_data(session: Session, user: User) -> dict:
-    """Helper function to get token data for OAuth redirects"""
+async def _issue_tokens_data(
+    session: AsyncSession, user: User, device_label: str | None, family_id: str | None = None
+) -> dict:
+    """Issue an access token and a stored refresh token, committing the session."""
     expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access = create_access_token(data={"sub": user.email}, expires_delta=expire)
-    refresh = create_refresh_token(data={"sub": user.email})
-    
-    user.refresh_token = refresh
-    session.add(user)
-    session.commit()
-    return {"access_token": access, "token_type": "bearer"}
+    access = create_access_token(data={"sub": user.email, "uid": user.id}, expires_delta=expire)
+    refresh = issue_refresh_token(session, user.id, user.email, family_id=family_id, device_label=device_label)
+    await session.commit()
+    return {"access_token": access, "refresh_token": refresh, "token_type": "bearer"}
 
 @router.get("/google")
 async def login_google(request: Request):
@@ -153,46 +181,23 @@ async def google_login(request: Request, session: SessionDep):
             "grant_type": "authorization_code",
             "redirect_uri": os.getenv("GOOGLE_REDIRECT_URI")
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=token_data)
-            tokens = response.json()
+        client = get_http_client()
+        response = await client.post(token_url, data=token_data)
+        tokens = response.json()
         if "access_token" not in tokens:
             raise HTTPException(status_code=400, detail="Failed to get access token")
-        user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-        async with httpx.AsyncClient() as client:
+        # Verified id_token claims spare the userinfo round trip
+        user_data = await google_oidc.claims_from_tokens(tokens)
+        if not user_data or not user_data.get("email") or user_data.get("email_verified") is False:
+            user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
             user_response = await client.get(user_info_url, headers=headers)
             user_data = user_response.json()
-        existing_user = session.query(User).filter(User.email == user_data["email"]).first()
-        if existing_user:
-            tokens = _issue_tokens_data(session, existing_user)
-             
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_data.get('name', 'User')}"
-            )
-        else:
-            random_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-            hashed_password = hash_password(random_password)
-            new_user = User(
-                name=user_data.get("name", "Google User"),
-                email=user_data["email"],
-                password=hashed_password,
-                city=None
-            )
-            session.add(new_user)
-            session.commit()
-            session.refresh(new_user)
-            create_complete_user_setup(session, new_user)
-            tokens = _issue_tokens_data(session, new_user)
-             
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_data.get('name', 'User')}"
-            )
+        return await _oauth_login_redirect(session, request, user_data["email"], user_data.get("name") or "Google User")
     except HTTPException:
         raise
     except Exception as e:
+        await session.rollback()
         raise HTTPException(status_code=400, detail=f"Login failed: {str(e)}")
 
 @router.get("/linkedin")
@@ -213,68 +218,49 @@ async def linkedin_login(request: Request, session: SessionDep):
             "client_secret": os.getenv("LINKEDIN_CLIENT_SECRET"),
             "redirect_uri": os.getenv("LINKEDIN_REDIRECT_URI")
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=token_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
-            tokens = response.json()
+        client = get_http_client()
+        response = await client.post(token_url, data=token_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
+        tokens = response.json()
         if "access_token" not in tokens:
             error_desc = tokens.get("error_description", "Unknown error")
             raise HTTPException(status_code=400, detail=f"Failed to get access token: {error_desc}")
         headers = {"Authorization": f"Bearer {tokens['access_token']}"}
         user_data = None
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get("https://api.linkedin.com/v2/userinfo", headers=headers)
-            if user_response.status_code == 200:
-                user_data = user_response.json()
-            else:
-                profile_response = await client.get("https://api.linkedin.com/v2/people/~?projection=(id,firstName,lastName)", headers=headers)
-                email_response = await client.get("https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))", headers=headers)
-                if profile_response.status_code != 200:
-                    raise HTTPException(status_code=400, detail=f"Failed to get user profile: {profile_response.text}")
-                profile_data = profile_response.json()
-                user_email = None
-                if email_response.status_code == 200:
-                    email_data = email_response.json()
-                    elements = email_data.get("elements", [])
-                    if elements:
-                        user_email = elements[0].get("handle~", {}).get("emailAddress")
-                if not user_email:
-                    raise HTTPException(status_code=400, detail="Could not retrieve email from LinkedIn")
-                first_name_data = profile_data.get("firstName", {}).get("localized", {})
-                last_name_data = profile_data.get("lastName", {}).get("localized", {})
-                first_name = list(first_name_data.values())[0] if first_name_data else ""
-                last_name = list(last_name_data.values())[0] if last_name_data else ""
-                full_name = f"{first_name} {last_name}".strip()
-                user_data = {"email": user_email, "name": full_name, "given_name": first_name, "family_name": last_name}
-        if not user_data or not user_data.get("email"):
-            raise HTTPException(status_code=400, detail="Could not retrieve user data from LinkedIn")
-        existing_user = session.query(User).filter(User.email == user_data["email"]).first()
-        if existing_user:
-            tokens = _issue_tokens_data(session, existing_user)
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_data.get('name', 'User')}"
-            )
+        user_response = await client.get("https://api.linkedin.com/v2/userinfo", headers=headers)
+        if user_response.status_code == 200:
+            user_data = user_response.json()
         else:
-            random_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-            hashed_password = hash_password(random_password)
-            user_name = user_data.get("name") or f"{user_data.get('given_name', '')} {user_data.get('family_name', '')}".strip()
-            if not user_name:
-                user_name = "LinkedIn User"
-            new_user = User(name=user_name, email=user_data["email"], password=hashed_password, city=None)
-            session.add(new_user)
-            session.commit()
-            session.refresh(new_user)
-            create_complete_user_setup(session, new_user)
-            tokens = _issue_tokens_data(session, new_user)
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_name}"
+            profile_response, email_response = await asyncio.gather(
+                client.get("https://api.linkedin.com/v2/people/~?projection=(id,firstName,lastName)", headers=headers),
+                client.get("https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))", headers=headers),
             )
+            if profile_response.status_code != 200:
+                raise HTTPException(status_code=400, detail=f"Failed to get user profile: {profile_response.text}")
+            profile_data = profile_response.json()
+            user_email = None
+            if email_response.status_code == 200:
+                email_data = email_response.json()
+                elements = email_data.get("elements", [])
+                if elements:
+                    user_email = elements[0].get("handle~", {}).get("emailAddress")
+            if not user_email:
+                raise HTTPException(status_code=400, detail="Could not retrieve email from LinkedIn")
+            first_name_data = profile_data.get("firstName", {}).get("localized", {})
+            last_name_data = profile_data.get("lastName", {}).get("localized", {})
+            first_name = list(first_name_data.values())[0] if first_name_data else ""
+            last_name = list(last_name_data.values())[0] if last_name_data else ""
+            full_name = f"{first_name} {last_name}".strip()
+            user_data = {"email": user_email, "name": full_name, "given_name": first_name, "family_name": last_name}
+        if not user_data or not user_data.get("email"):
+            raise HTTPException(status_code=400, detail="Could not retrieve user data from LinkedIn")
+        user_name = user_data.get("name") or f"{user_data.get('given_name', '')} {user_data.get('family_name', '')}".strip()
+        return await _oauth_login_redirect(session, request, user_data["email"], user_name or "LinkedIn User")
     except HTTPException:
         raise  
     except Exception as e:
+        await session.rollback()
         raise HTTPException(status_code=400, detail=f"Login failed: {str(e)}")
 
 @router.get("/microsoft")
@@ -294,101 +280,92 @@ async def microsoft_login(request: Request, session: SessionDep):
             "code": code,
             "grant_type": "authorization_code",
             "redirect_uri": MICROSOFT_REDIRECT_URI,
-            "scope": "https://graph.microsoft.com/User.Read"
+            "scope": "openid email profile https://graph.microsoft.com/User.Read"
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=token_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
-            tokens = response.json()
+        client = get_http_client()
+        response = await client.post(token_url, data=token_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
+        tokens = response.json()
         if "access_token" not in tokens:
             error_desc = tokens.get("error_description", "Unknown error")
             raise HTTPException(status_code=400, detail=f"Failed to get access token: {error_desc}")
-        user_info_url = "https://graph.microsoft.com/v1.0/me"
-        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-        async with httpx.AsyncClient() as client:
+        claims = await microsoft_oidc.claims_from_tokens(tokens) or {}
+        user_email = claims.get("email") or claims.get("preferred_username")
+        user_name = claims.get("name")
+        if not user_email:
+            user_info_url = "https://graph.microsoft.com/v1.0/me"
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
             user_response = await client.get(user_info_url, headers=headers)
             if user_response.status_code != 200:
                 raise HTTPException(status_code=400, detail=f"Failed to get user info: {user_response.text}")
             user_data = user_response.json()
-        if not user_data.get("mail") and not user_data.get("userPrincipalName"):
-            raise HTTPException(status_code=400, detail="Could not retrieve email from Microsoft")
-        user_email = user_data.get("mail") or user_data.get("userPrincipalName")
-        user_name = user_data.get("displayName", "Microsoft User")
-        existing_user = session.query(User).filter(User.email == user_email).first()
-        if existing_user:
-            tokens = _issue_tokens_data(session, existing_user)
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_name}"
-            )
-        else:
-            random_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-            hashed_password = hash_password(random_password)
-            new_user = User(name=user_name, email=user_email, password=hashed_password, city=None)
-            session.add(new_user)
-            session.commit()
-            session.refresh(new_user)
-            create_complete_user_setup(session, new_user)
-            tokens = _issue_tokens_data(session, new_user)
-            frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-            return RedirectResponse(
-                url=f"{frontend_url}/auth/callback?token={tokens['access_token']}&name={user_name}"
-            )
+            if not user_data.get("mail") and not user_data.get("userPrincipalName"):
+                raise HTTPException(status_code=400, detail="Could not retrieve email from Microsoft")
+            user_email = user_data.get("mail") or user_data.get("userPrincipalName")
+            user_name = user_data.get("displayName")
+        return await _oauth_login_redirect(session, request, user_email, user_name or "Microsoft User")
     except HTTPException:
         raise  
     except Exception as e:
+        await session.rollback()
         raise HTTPException(status_code=400, detail=f"Login failed: {str(e)}")
 
 @router.post("/register")
-def register(session: SessionDep, user_data: CreateUser):  
-    if session.query(User).filter(User.email == user_data.email).first():     
+async def register(request: Request, session: SessionDep, user_data: CreateUser):  
+    if await session.scalar(select(User).where(User.email == user_data.email)):     
         raise HTTPException(status_code=400, detail="Email is already registered")
-    hash_pwd = hash_password(user_data.password)
+    hash_pwd = await password_pool.hash(user_data.password)
     user = User(name=user_data.name, email=user_data.email, password=hash_pwd, phone=user_data.phone, city=user_data.city)
     session.add(user)
-    session.commit()
-    session.refresh(user)
-    create_complete_user_setup(session, user)
-    return _issue_tokens_response(session, user)
+    await session.flush()
+    await create_complete_user_setup(session, user)
+    return await _issue_tokens_response(session, user, _device_label(request))
 
 @router.post("/login", response_model=Token)
-def login(session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
-    user = session.query(User).filter(User.email == form_data.username).first()
+async def login(request: Request, session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+    user = await session.scalar(select(User).where(User.email == form_data.username))
     if not user:
         raise HTTPException(status_code=404, detail="Invalid Credentials")
-    pwd = verify_password(form_data.password, user.password)
+    pwd, new_hash = await password_pool.verify(form_data.password, user.password)
     if not pwd:
         raise HTTPException(status_code=404, detail="Invalid Credentials")
-    return _issue_tokens_response(session, user)
+    if new_hash:
+        # Stored with an outdated cost factor; saved with the new tokens
+        user.password = new_hash
+    return await _issue_tokens_response(session, user, _device_label(request))
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(request: Request, session: SessionDep):
+async def refresh_token(request: Request, session: SessionDep):
     refresh_token_cookie = request.cookies.get("refresh_token")
     if not refresh_token_cookie:
         raise HTTPException(status_code=401, detail="Refresh token not found")
     decoded = decode_refresh_token(refresh_token_cookie)
     if not decoded or not decoded.get("sub"):
         raise HTTPException(status_code=401, detail="Invalid refresh token")
-    user = session.query(User).filter(User.email == decoded["sub"]).first()
-    if not user or not user.refresh_token:
+    rotated = await rotate_refresh_token(session, refresh_token_cookie)
+    if rotated is None:
         raise HTTPException(status_code=403, detail="Refresh token invalid or revoked")
-    if user.refresh_token != refresh_token_cookie:
-        raise HTTPException(status_code=403, detail="Refresh token mismatch")
-    return _issue_tokens_response(session, user)
+    user = await session.get(User, rotated.user_id)
+    if not user or user.email != decoded["sub"]:
+        raise HTTPException(status_code=403, detail="Refresh token invalid or revoked")
+    return await _issue_tokens_response(session, user, rotated.device_label, rotated.family_id)
 
 @router.post("/logout")
-def logout(request: Request, session: SessionDep):
+async def logout(
+    request: Request,
+    session: SessionDep,
+    access_token: Annotated[str | None, Depends(optional_oauth2_scheme)] = None,
+):
     refresh_token_cookie = request.cookies.get("refresh_token")
-    user = None
     if refresh_token_cookie:
-        decoded = decode_refresh_token(refresh_token_cookie)
-        if decoded and decoded.get("sub"):
-            user = session.query(User).filter(User.email == decoded["sub"]).first()
-    if user:
-        user.refresh_token = None
-        session.add(user)
-        session.commit()
+        await revoke_refresh_token(session, refresh_token_cookie)
+    # The access token would otherwise stay valid until it expires
+    payload = decode_token(access_token) if access_token else None
+    if payload and payload.get("jti"):
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+        await token_revocations.revoke(session, payload["jti"], expires_at, payload.get("uid"))
+    await session.commit()
     response = Response(content=json.dumps({"message": "Logged out"}), media_type="application/json")
     response.delete_cookie(
         key="refresh_token",
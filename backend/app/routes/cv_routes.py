@@ -1,14 +1,20 @@
 from fastapi import Depends, HTTPException, APIRouter
-from typing import Annotated, List
-from sqlalchemy.orm import Session
-from app.models.user_model import User
+from typing import Annotated, List, Optional
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 from app.models.cv_model import CV
-from app.models.role_model import Role
+from app.models.cv_text_model import CVText
 from app.schemas import (
     CVPresignRequest, CVPresignResponse, CVConfirmRequest, 
     CVResponse, CVListResponse, CVDownloadResponse
 )
-from app.dependencies import SessionDep, get_curr_user
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.pagination import keyset_page
+from app.services.activity_stream import record_activity
+from app.services.cv_text import get_cv_text
+from app.services.role_catalog import role_catalog
+from app.services.screening_pipeline import ScreeningError
+from app.services.user_counters import bump_counters, get_counters
 import os
 import boto3
 from botocore.exceptions import ClientError
@@ -16,6 +22,9 @@ import uuid
 
 router = APIRouter()
 
+MAX_PREVIEW_CHARS = 5000
+MAX_SEARCH_RESULTS = 50
+
  
 STORAGE_ENDPOINT = os.getenv("STORAGE_ENDPOINT", "http://127.0.0.1:9000")
 STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "cvs")
@@ -32,9 +41,9 @@ s3_client = boto3.client(
 )
 
 @router.post("/presign", response_model=CVPresignResponse)
-def presign_cv_upload(
+async def presign_cv_upload(
     presign_data: CVPresignRequest,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     """
@@ -49,11 +58,7 @@ def presign_cv_upload(
     try:
        
         if presign_data.role_id:
-            role = session.query(Role).filter(
-                Role.id == presign_data.role_id, 
-                Role.is_active == True
-            ).first()
-            if not role:
+            if not role_catalog.get(presign_data.role_id):
                 raise HTTPException(status_code=404, detail="Role not found or inactive")
 
          
@@ -85,6 +90,8 @@ def presign_cv_upload(
             }
         )
 
+    except HTTPException:
+        raise
     except ClientError as e:
         raise HTTPException(status_code=500, detail=f"Storage service error: {str(e)}")
     except Exception as e:
@@ -93,9 +100,9 @@ def presign_cv_upload(
  
 
 @router.post("/confirm", response_model=CVResponse)
-def confirm_cv_upload(
+async def confirm_cv_upload(
     confirm_data: CVConfirmRequest,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     """
@@ -104,11 +111,7 @@ def confirm_cv_upload(
     try:
        
         if confirm_data.role_id:
-            role = session.query(Role).filter(
-                Role.id == confirm_data.role_id, 
-                Role.is_active == True
-            ).first()
-            if not role:
+            if not role_catalog.get(confirm_data.role_id):
                 raise HTTPException(status_code=404, detail="Role not found or inactive")
 
          
@@ -131,8 +134,11 @@ def confirm_cv_upload(
         )
         
         session.add(cv)
-        session.commit()
-        session.refresh(cv)
+        await session.flush()
+        record_activity(session, current_user.id, kind="cv_upload", message=f"Uploaded CV {cv.filename}", ref_id=str(cv.id))
+        await bump_counters(session, current_user.id, cvs=1)
+        await session.commit()
+        await session.refresh(cv)
 
         return CVResponse(
             id=cv.id,
@@ -149,27 +155,25 @@ def confirm_cv_upload(
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to confirm CV upload: {str(e)}")
 
 @router.get("/", response_model=CVListResponse)
-def get_user_cvs(
-    current_user: Annotated[User, Depends(get_curr_user)],
+async def get_user_cvs(
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep,
-    skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ):
     """
-    Get list of user's CVs with pagination
+    Get list of user's CVs, newest first; pass next_cursor back for the next page
     """
     try:
-         
-        total = session.query(CV).filter(CV.user_id == current_user.id).count()
-        
-         
-        cvs = session.query(CV).filter(
-            CV.user_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        cvs, next_cursor = await keyset_page(
+            session, select(CV).where(CV.user_id == current_user.id), CV, limit, cursor
+        )
+        total = (await get_counters(session, current_user.id)).cv_count if include_total else None
 
         cv_responses = [
             CVResponse(
@@ -186,15 +190,94 @@ def get_user_cvs(
             for cv in cvs
         ]
 
-        return CVListResponse(cvs=cv_responses, total=total)
+        return CVListResponse(cvs=cv_responses, total=total, next_cursor=next_cursor)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get CVs: {str(e)}")
 
+@router.get("/search")
+async def search_cvs(
+    q: str,
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep
+):
+    """
+    Search the user's CVs by their extracted text
+    
+    Only CVs whose text has already been extracted (e.g. by a screening
+    or a preview) are searched; storage is never touched.
+    """
+    term = q.strip()
+    if not term:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    try:
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = (await session.execute(
+            select(CV.id, CV.filename, CV.created_at)
+            .join(CVText, CVText.cv_id == CV.id)
+            .where(CV.user_id == current_user.id, CVText.text.ilike(pattern))
+            .order_by(CV.created_at.desc())
+            .limit(MAX_SEARCH_RESULTS)
+        )).all()
+        return {
+            "results": [
+                {"cv_id": row.id, "filename": row.filename, "created_at": row.created_at}
+                for row in rows
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search CVs: {str(e)}")
+
+
+@router.get("/{cv_id}/text")
+async def get_cv_text_preview(
+    cv_id: int,
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep,
+    max_chars: int = 1000
+):
+    """
+    Preview the extracted text of a CV
+    
+    Served from the stored extraction; the file is only downloaded and
+    parsed the first time, or after the extractor changes.
+    """
+    try:
+        cv = await session.scalar(select(CV).where(
+            CV.id == cv_id,
+            CV.user_id == current_user.id
+        ))
+        if not cv:
+            raise HTTPException(status_code=404, detail="CV not found")
+        # Give the connection back before a possible download and extraction
+        await session.close()
+
+        cv_text = await get_cv_text(cv, verify=False)
+        max_chars = max(1, min(max_chars, MAX_PREVIEW_CHARS))
+        return {
+            "cv_id": cv.id,
+            "text": cv_text.text[:max_chars],
+            "truncated": cv_text.char_count > max_chars,
+            "char_count": cv_text.char_count,
+            "page_count": cv_text.page_count,
+        }
+
+    except HTTPException:
+        raise
+    except ScreeningError as e:
+        await session.rollback()
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to get CV text: {str(e)}")
+
+
 @router.delete("/{cv_id}")
-def delete_cv(
+async def delete_cv(
     cv_id: int,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     """
@@ -202,10 +285,10 @@ def delete_cv(
     """
     try:
          
-        cv = session.query(CV).filter(
+        cv = await session.scalar(select(CV).where(
             CV.id == cv_id,
             CV.user_id == current_user.id
-        ).first()
+        ))
         
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found")
@@ -217,7 +300,7 @@ def delete_cv(
             storage_url_parts = cv.storage_url.split(f"{STORAGE_BUCKET}/")
             if len(storage_url_parts) == 2:
                 key = storage_url_parts[1]
-                s3_client.delete_object(Bucket=STORAGE_BUCKET, Key=key)
+                await run_in_threadpool(s3_client.delete_object, Bucket=STORAGE_BUCKET, Key=key)
                 minio_deleted = True
         except Exception as e:
              
@@ -225,8 +308,9 @@ def delete_cv(
             minio_deleted = False
 
          
-        session.delete(cv)
-        session.commit()
+        await session.delete(cv)
+        await bump_counters(session, current_user.id, cvs=-1)
+        await session.commit()
 
 
         if minio_deleted:
@@ -240,14 +324,14 @@ def delete_cv(
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete CV: {str(e)}")
 
 
 @router.get("/{cv_id}/download", response_model=CVDownloadResponse)
-def get_cv_download_url(
+async def get_cv_download_url(
     cv_id: int,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     """
@@ -261,10 +345,10 @@ def get_cv_download_url(
     The URL can be used to download/view the file directly from MinIO
     """
     try:
-        cv = session.query(CV).filter(
+        cv = await session.scalar(select(CV).where(
             CV.id == cv_id,
             CV.user_id == current_user.id
-        ).first()
+        ))
         
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found")
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from app.database import get_pool_stats
+from app.dependencies import get_admin_user
+from app.services.analysis_cache import analysis_cache_stats
+
+router = APIRouter()
+
+@router.get("/health")
+def get_health():
+    return {"ok": True}
+
+@router.get("/health/db", dependencies=[Depends(get_admin_user)])
+def get_db_health():
+    return {"pools": get_pool_stats()}
+
+@router.get("/health/analysis-cache", dependencies=[Depends(get_admin_user)])
+def get_analysis_cache_health():
+    return analysis_cache_stats.snapshot()
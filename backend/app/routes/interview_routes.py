@@ -1,17 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import Annotated, Optional
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 import os
-import requests
-from requests import HTTPError
+import httpx
 
-from app.dependencies import SessionDep, get_curr_user
-from app.models.user_model import User
-from app.models.wallet_model import Wallet
-from app.models.transaction_model import Transaction
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.http_client import get_http_client
+from app.services.activity_stream import record_activity
+from app.services.role_catalog import role_catalog
+from app.services.wallet_ledger import InsufficientCredits, capture, place_hold, release
 from app.models.interview_model import Interview
-from app.models.role_model import Role
 from app.models.user_role_selection_model import UserRoleSelection
 
 router = APIRouter()
@@ -30,6 +29,8 @@ TAVUS_PERSONA_DATA = os.getenv("TAVUS_PERSONA_DATA")
 TAVUS_REPLICA_SECURITY = os.getenv("TAVUS_REPLICA_SECURITY")
 TAVUS_PERSONA_SECURITY = os.getenv("TAVUS_PERSONA_SECURITY")
 
+INTERVIEW_CREDITS = 5
+
 class StartInterviewRequest(BaseModel):
     role_id: int
     cv_id: Optional[int] = None
@@ -39,8 +40,8 @@ class StartInterviewResponse(BaseModel):
     join_url: Optional[str] = None
 
 
-def resolve_tavus_profile_for_role(session: Session, role_id: int) -> tuple[str, str]:
-    role = session.query(Role).filter(Role.id == role_id).first()
+def resolve_tavus_profile_for_role(role_id: int) -> tuple[str, str]:
+    role = role_catalog.get(role_id)
     role_name = (getattr(role, 'title', None) or '').lower()
     if "software" in role_name or "engineer" in role_name:
         replica = TAVUS_REPLICA_SOFTWARE or TAVUS_REPLICA_DEFAULT
@@ -59,57 +60,44 @@ def resolve_tavus_profile_for_role(session: Session, role_id: int) -> tuple[str,
     return replica, persona
 
 @router.post("/start", response_model=StartInterviewResponse)
-def start_interview(
+async def start_interview(
     body: StartInterviewRequest,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     try:
-        wallet = session.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet or wallet.balance_credits < 5:
-            raise HTTPException(status_code=400, detail="Insufficient credits")
-
-        wallet.balance_credits -= 5
-        session.add(wallet)
-
+        if not role_catalog.get(body.role_id):
+            raise HTTPException(status_code=404, detail="Role not found or inactive")
         interview = Interview(
             user_id=current_user.id,
             role_id=body.role_id,
             cv_id=body.cv_id,
             status="in_progress",
-            credits_used=5,
+            credits_used=INTERVIEW_CREDITS,
         )
         session.add(interview)
-        session.commit()
-        session.refresh(interview)
-
-        transaction = Transaction(
-            user_id=current_user.id,
-            type="purchase",
-            credits=5,
-            amount_inr=None,
-            currency="INR",
-            payment_gateway="tavus",
-            external_ref=str(interview.id),
-            status="success",
-        )
-        session.add(transaction)
-        session.commit()
+        await session.flush()
+        record_activity(session, current_user.id, kind="interview", message=f"Interview {interview.status}", ref_id=str(interview.id))
+        try:
+            # Held, not debited, until Tavus has created the conversation
+            hold_id = await place_hold(session, current_user.id, INTERVIEW_CREDITS, external_ref=str(interview.id), payment_gateway="tavus")
+        except InsufficientCredits:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Insufficient credits")
+        selected_role_ids = (await session.scalars(
+            select(UserRoleSelection.role_id).where(UserRoleSelection.user_id == current_user.id)
+        )).all()
+        # Committing returns the connection to the pool; none is held across the Tavus calls
+        await session.commit()
 
         join_url: Optional[str] = None
         try:
             if not TAVUS_API_KEY:
                 raise Exception("TAVUS_API_KEY not configured")
 
-            replica_id, persona_id = resolve_tavus_profile_for_role(session, body.role_id)
+            replica_id, persona_id = resolve_tavus_profile_for_role(body.role_id)
 
-            selections = (
-                session.query(UserRoleSelection, Role)
-                .join(Role, UserRoleSelection.role_id == Role.id)
-                .filter(UserRoleSelection.user_id == current_user.id)
-                .all()
-            )
-            selected_role_titles = [r.title for _, r in selections]
+            selected_role_titles = [role.title for rid in selected_role_ids if (role := role_catalog.get(rid))]
             roles_context = ", ".join(selected_role_titles) if selected_role_titles else None
 
             headers = {
@@ -130,8 +118,8 @@ def start_interview(
             else:
                 payload_with_instructions = payload
 
-            def create_conv(p):
-                resp_local = requests.post(
+            async def create_conv(p):
+                resp_local = await get_http_client().post(
                     f"{TAVUS_BASE_URL.rstrip('/')}/v2/conversations",
                     json=p,
                     headers=headers,
@@ -139,7 +127,7 @@ def start_interview(
                 )
                 try:
                     resp_local.raise_for_status()
-                except HTTPError:
+                except httpx.HTTPStatusError:
                     detail = None
                     try:
                         detail = resp_local.json()
@@ -149,11 +137,11 @@ def start_interview(
                 return resp_local.json()
 
             try:
-                data = create_conv(payload_with_instructions)
+                data = await create_conv(payload_with_instructions)
             except HTTPException as he:
                 msg = str(he.detail)
                 if "Unknown field" in msg or "unknown field" in msg or "Unrecognized" in msg:
-                    data = create_conv(payload)
+                    data = await create_conv(payload)
                 else:
                     raise
 
@@ -172,7 +160,7 @@ def start_interview(
                             "Ask one question at a time and wait for my response. Start now."
                         ),
                     }
-                    requests.post(
+                    await get_http_client().post(
                         f"{TAVUS_BASE_URL.rstrip('/')}/v2/conversations/{conv_id}/messages",
                         json=seed_body,
                         headers=headers,
@@ -180,18 +168,25 @@ def start_interview(
                     )
                 except Exception as _:
                     pass
-        except HTTPException:
-            raise
         except Exception as e:
+            # No conversation was created, so the interview never happened
+            interview.status = "failed"
+            record_activity(session, current_user.id, kind="interview", message=f"Interview {interview.status}", ref_id=str(interview.id))
+            await release(session, hold_id, INTERVIEW_CREDITS)
+            await session.commit()
+            if isinstance(e, HTTPException):
+                raise
             print(f"Tavus conversation creation failed: {e}")
             raise HTTPException(status_code=502, detail=f"Tavus conversation creation failed: {str(e)}")
 
+        await capture(session, hold_id, INTERVIEW_CREDITS, external_ref=str(interview.id))
+        await session.commit()
         return StartInterviewResponse(id=interview.id, join_url=join_url)
 
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to start interview: {str(e)}")
 
 
@@ -209,16 +204,19 @@ async def tavus_webhook(request: Request, session: SessionDep):
         if isinstance(interview_ref, str) and interview_ref.startswith("interview_"):
             try:
                 interview_id = int(interview_ref.split("_", 1)[1])
-                interview = session.query(Interview).filter(Interview.id == interview_id).first()
+                interview = await session.scalar(select(Interview).where(Interview.id == interview_id))
             except Exception:
                 interview = None
 
         if interview:
+            previous_status = interview.status
             if status in ("completed", "ended", "finished", "done"):
                 interview.status = "done"
             elif status in ("failed", "canceled", "cancelled"):
                 interview.status = "failed"
-            session.commit()
+            if interview.status != previous_status:
+                record_activity(session, interview.user_id, kind="interview", message=f"Interview {interview.status}", ref_id=str(interview.id))
+            await session.commit()
 
         return {"ok": True}
     except Exception as e:
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, APIRouter
-from typing import Annotated
-from sqlalchemy.orm import Session
-from app.models.user_model import User
+from typing import Annotated, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.wallet_model import Wallet
 from app.models.transaction_model import Transaction
 from app.models.payment_model import Payment
@@ -9,7 +9,10 @@ from app.schemas import (
     PaymentWalletResponse, PaymentTransactionResponse, PaymentOrderRequest,
     PaymentOrderResponse, TransactionListResponse
 )
-from app.dependencies import SessionDep, get_curr_user
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.pagination import keyset_page
+from app.services.user_counters import get_counters
+from app.services.wallet_ledger import held_credits, purchase
 from decimal import Decimal
 
 router = APIRouter()
@@ -21,26 +24,26 @@ CREDIT_PACKS = {
     4: {"credits": 100, "amount_inr": Decimal("750.00"), "description": "100 Credits Pack"},
 }
 
-def get_or_create_wallet(user_id: int, session: Session) -> Wallet:
-    wallet = session.query(Wallet).filter(Wallet.user_id == user_id).first()
+async def get_or_create_wallet(user_id: int, session: AsyncSession) -> Wallet:
+    wallet = await session.scalar(select(Wallet).where(Wallet.user_id == user_id))
     if not wallet:
         wallet = Wallet(user_id=user_id, balance_credits=0)
         session.add(wallet)
-        session.commit()
-        session.refresh(wallet)
+        await session.commit()
+        await session.refresh(wallet)
     return wallet
 
 @router.get("/wallet", response_model=PaymentWalletResponse)
-def get_wallet(
-    current_user: Annotated[User, Depends(get_curr_user)],
+async def get_wallet(
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     try:
-        wallet = get_or_create_wallet(current_user.id, session)
+        wallet = await get_or_create_wallet(current_user.id, session)
         
-        transactions = session.query(Transaction).filter(
+        transactions = (await session.scalars(select(Transaction).where(
             Transaction.user_id == current_user.id
-        ).order_by(Transaction.created_at.desc()).limit(5).all()
+        ).order_by(Transaction.created_at.desc()).limit(5))).all()
         
         transaction_responses = [
             PaymentTransactionResponse(
@@ -60,6 +63,7 @@ def get_wallet(
         
         return PaymentWalletResponse(
             balance_credits=wallet.balance_credits,
+            held_credits=await held_credits(session, current_user.id),
             last_transactions=transaction_responses
         )
         
@@ -67,9 +71,9 @@ def get_wallet(
         raise HTTPException(status_code=500, detail=f"Failed to get wallet: {str(e)}")
 
 @router.post("/payments/order", response_model=PaymentOrderResponse)
-def create_payment_order(
+async def create_payment_order(
     order_data: PaymentOrderRequest,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     try:
@@ -88,26 +92,13 @@ def create_payment_order(
             payload_json={"pack_id": order_data.pack_id, "credits": pack["credits"]}
         )
         session.add(payment)
-        session.commit()
-        session.refresh(payment)
-        wallet = get_or_create_wallet(current_user.id, session)
-        wallet.balance_credits += int(pack["credits"])
-        session.add(wallet)
-        from app.models.transaction_model import Transaction
-        transaction = Transaction(
-            user_id=current_user.id,
-            type="purchase",
-            credits=int(pack["credits"]),
-            amount_inr=pack["amount_inr"],
-            currency="INR",
-            payment_gateway="credit_pack",
-            external_ref=order_id,
-            status="success"
-        )
-        session.add(transaction)
+        await session.commit()
+        await session.refresh(payment)
+        await get_or_create_wallet(current_user.id, session)
+        # One statement credits the balance in place and writes the ledger row
+        await purchase(session, current_user.id, int(pack["credits"]), pack["amount_inr"], external_ref=order_id)
         payment.status = "success"
-        session.commit()
-        print(f"DEBUG WALLET: user={wallet.user_id} credits={wallet.balance_credits}")
+        await session.commit()
         return PaymentOrderResponse(
             order_id=order_id,
             amount=pack["amount_inr"]
@@ -115,24 +106,22 @@ def create_payment_order(
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create payment order: {str(e)}")
 
 @router.get("/transactions", response_model=TransactionListResponse)
-def get_transactions(
-    current_user: Annotated[User, Depends(get_curr_user)],
+async def get_transactions(
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep,
-    skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ):
     try:
-        total = session.query(Transaction).filter(
-            Transaction.user_id == current_user.id
-        ).count()
-        
-        transactions = session.query(Transaction).filter(
-            Transaction.user_id == current_user.id
-        ).order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+        transactions, next_cursor = await keyset_page(
+            session, select(Transaction).where(Transaction.user_id == current_user.id), Transaction, limit, cursor
+        )
+        total = (await get_counters(session, current_user.id)).transaction_count if include_total else None
         
         transaction_responses = [
             PaymentTransactionResponse(
@@ -152,9 +141,12 @@ def get_transactions(
         
         return TransactionListResponse(
             transactions=transaction_responses,
-            total=total
+            total=total,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get transactions: {str(e)}")
 
@@ -1,23 +1,25 @@
 from fastapi import  Depends, HTTPException, APIRouter
 from typing import Annotated
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.models.user_model import User
 from app.models.user_profiles_model import UserProfile
-from app.models.activity_model import Activity
+from app.models.persona_model import Persona
 from app.schemas import (
     UserProfileUpdate, UserWithProfile
 )
-from app.dependencies import SessionDep, get_curr_user
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.user_cache import user_cache
+from app.services.activity_stream import record_activity
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserWithProfile)
-def get_user_profile(current_user: Annotated[User, Depends(get_curr_user)], session: SessionDep):
+async def get_user_profile(current_user: Annotated[CurrentUser, Depends(get_curr_user)], session: SessionDep):
     try:
-        user_profile = session.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+        user_profile = await session.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id))
         wallet_balance = 0
         from app.models.wallet_model import Wallet
-        wallet = session.query(Wallet).filter(Wallet.user_id == current_user.id).first()
+        wallet = await session.scalar(select(Wallet).where(Wallet.user_id == current_user.id))
         wallet_balance = wallet.balance_credits if wallet else 0
         user_data = {
             "id": current_user.id,
@@ -37,38 +39,47 @@ def get_user_profile(current_user: Annotated[User, Depends(get_curr_user)], sess
                 "created_at": user_profile.created_at,
                 "updated_at": user_profile.updated_at
             }
-        return {"user": user_data, "profile": profile_data, "wallet_balance": wallet_balance}
+        persona = await session.scalar(select(Persona).where(Persona.user_id == current_user.id).order_by(Persona.id).limit(1))
+        persona_data = None
+        if persona:
+            persona_data = {
+                "summary": persona.summary,
+                "skills": persona.skills or [],
+                "updated_at": persona.updated_at
+            }
+        return {"user": user_data, "profile": profile_data, "wallet_balance": wallet_balance, "persona": persona_data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get user profile: {str(e)}")
 
 @router.put("/me/profile")
-def update_user_profile(
+async def update_user_profile(
     profile_data: UserProfileUpdate,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
     try:
-        user_profile = session.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+        user_profile = await session.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id))
         if not user_profile:
             raise HTTPException(status_code=404, detail="User profile not found")
+        user = await session.get(User, current_user.id)
         if profile_data.full_name is not None:
             user_profile.full_name = profile_data.full_name
         if profile_data.phone is not None:
             user_profile.phone = profile_data.phone
 
-            current_user.phone = profile_data.phone
+            user.phone = profile_data.phone
         if profile_data.city is not None:
             user_profile.city = profile_data.city
              
-            current_user.city = profile_data.city
-        activity = Activity(user_id=current_user.id, kind="profile_update", ref_id=f"profile_update_{current_user.id}")
-        session.add(activity)
-        session.commit()
+            user.city = profile_data.city
+        record_activity(session, current_user.id, kind="profile_update", message="Profile updated", ref_id=f"profile_update_{current_user.id}")
+        await session.commit()
+        user_cache.invalidate(current_user.email)
         return {"message": "Profile updated successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update profile: {str(e)}")
 
 
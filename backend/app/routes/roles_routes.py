@@ -1,88 +1,29 @@
-from fastapi import  Depends, HTTPException, APIRouter
+from fastapi import  Depends, HTTPException, APIRouter, Request, Response
 from typing import Annotated, List
-from sqlalchemy.orm import Session
-from app.models.user_model import User
-from app.models.role_model import Role
+from sqlalchemy import select, delete
 from app.models.user_role_selection_model import UserRoleSelection
 from app.schemas import (
     RoleResponse, RoleSelectionCreate, UserRoleSelectionResponse
 )
-from app.dependencies import SessionDep, get_curr_user
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
+from app.services.activity_stream import record_activity
+from app.services.role_catalog import role_catalog
 
 router = APIRouter()
 
-DEFAULT_ROLES = [
-    {
-        "title": "Software Engineer",
-        "description": "Design, develop, and maintain software systems.",
-        "tags": ["software", "engineer", "backend", "frontend"],
-    },
-    {
-        "title": "Data Analyst",
-        "description": "Analyze data to produce insights and dashboards.",
-        "tags": ["data", "analyst", "sql", "excel"],
-    },
-    {
-        "title": "Cybersecurity Specialist",
-        "description": "Protect systems and networks from security threats.",
-        "tags": ["security", "cyber", "network", "siem"],
-    },
-    {
-        "title": "Product Manager",
-        "description": "Lead product strategy and execution.",
-        "tags": ["product", "management", "roadmap"],
-    },
-    {
-        "title": "Business Analyst",
-        "description": "Gather requirements and improve business processes.",
-        "tags": ["business", "analyst", "process"],
-    },
-    {
-        "title": "AI/ML Engineer",
-        "description": "Build AI/ML models and deploy them to production.",
-        "tags": ["ai", "ml", "python", "mlops"],
-    },
-]
-
 @router.get("/roles", response_model=List[RoleResponse])
-def get_roles(session: SessionDep):
-    try:
-        roles = session.query(Role).filter(Role.is_active == True).all()
-        if not roles:
-             
-            for item in DEFAULT_ROLES:
-                role = Role(title=item["title"], description=item["description"], tags=item["tags"]) 
-                session.add(role)
-            session.commit()
-            roles = session.query(Role).filter(Role.is_active == True).all()
-        else:
-             
-            existing_titles = {r.title for r in roles}
-            inserted = False
-            for item in DEFAULT_ROLES:
-                if item["title"] not in existing_titles:
-                    session.add(Role(title=item["title"], description=item["description"], tags=item["tags"]))
-                    inserted = True
-            if inserted:
-                session.commit()
-                roles = session.query(Role).filter(Role.is_active == True).all()
-        return [
-            {
-                "id": role.id,
-                "title": role.title,
-                "description": role.description,
-                "tags": role.tags or [],
-                "is_active": role.is_active
-            }
-            for role in roles
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get roles: {str(e)}")
+async def get_roles(request: Request):
+    snapshot = role_catalog.snapshot
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip().removeprefix("W/") in (snapshot.etag, "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 @router.post("/my/roles")
-def add_role_selection(
+async def add_role_selection(
     role_data: RoleSelectionCreate,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
     ):
     try:
@@ -91,15 +32,14 @@ def add_role_selection(
         
         for role_id in role_data.role_ids:
              
-            role = session.query(Role).filter(Role.id == role_id, Role.is_active == True).first()
-            if not role:
+            if not role_catalog.get(role_id):
                 raise HTTPException(status_code=404, detail=f"Role with ID {role_id} not found or inactive")
             
              
-            existing_selection = session.query(UserRoleSelection).filter(
+            existing_selection = await session.scalar(select(UserRoleSelection).where(
                 UserRoleSelection.user_id == current_user.id,
                 UserRoleSelection.role_id == role_id
-            ).first()
+            ))
             
             if existing_selection:
                 skipped_roles.append(role_id)
@@ -110,7 +50,9 @@ def add_role_selection(
             session.add(role_selection)
             added_roles.append(role_id)
         
-        session.commit()
+        if added_roles:
+            record_activity(session, current_user.id, kind="role_selection", message="Updated role selection", ref_id=",".join(map(str, added_roles))[:255])
+        await session.commit()
         
         response_message = f"Successfully added {len(added_roles)} role(s)"
         if skipped_roles:
@@ -125,53 +67,53 @@ def add_role_selection(
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to add role selections: {str(e)}")
 
 @router.post("/my/roles/set")
-def set_user_roles(
+async def set_user_roles(
     role_data: RoleSelectionCreate,
-    current_user: Annotated[User, Depends(get_curr_user)],
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
     session: SessionDep
 ):
                      
     try:
          
-        valid_ids = [r.id for r in session.query(Role).filter(Role.id.in_(role_data.role_ids), Role.is_active == True).all()]
+        valid_ids = {rid for rid in role_data.role_ids if role_catalog.get(rid)}
         if len(valid_ids) != len(role_data.role_ids):
             raise HTTPException(status_code=400, detail="One or more roles are invalid or inactive")
 
-        session.query(UserRoleSelection).filter(UserRoleSelection.user_id == current_user.id).delete()
+        await session.execute(delete(UserRoleSelection).where(UserRoleSelection.user_id == current_user.id))
          
         for rid in role_data.role_ids:
             session.add(UserRoleSelection(user_id=current_user.id, role_id=rid))
-        session.commit()
+        record_activity(session, current_user.id, kind="role_selection", message="Updated role selection", ref_id=",".join(map(str, role_data.role_ids))[:255])
+        await session.commit()
         return {"message": "Role selection updated", "role_ids": role_data.role_ids}
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to set user roles: {str(e)}")
 
 @router.get("/my/roles", response_model=List[UserRoleSelectionResponse])
-def get_user_roles(current_user: Annotated[User, Depends(get_curr_user)], session: SessionDep):
+async def get_user_roles(current_user: Annotated[CurrentUser, Depends(get_curr_user)], session: SessionDep):
     try:
-        role_selections = session.query(UserRoleSelection, Role).join(
-            Role, UserRoleSelection.role_id == Role.id
-        ).filter(
-            UserRoleSelection.user_id == current_user.id,
-            Role.is_active == True
-        ).all()
+        role_selections = (await session.scalars(select(UserRoleSelection).where(
+            UserRoleSelection.user_id == current_user.id
+        ))).all()
+        # Selections of roles that have since been deactivated are left out
         return [
             {
                 "id": selection.id,
                 "role_id": role.id,
                 "role_title": role.title,
                 "role_description": role.description,
-                "role_tags": role.tags or [],
+                "role_tags": list(role.tags),
                 "created_at": selection.created_at
             }
-            for selection, role in role_selections
+            for selection in role_selections
+            if (role := role_catalog.get(selection.role_id))
         ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get user roles: {str(e)}")
@@ -1,175 +1,329 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Annotated
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-import os
-import io
+from fastapi.responses import StreamingResponse
+from typing import Annotated, AsyncIterator, List, Optional
+from collections import Counter
+from datetime import datetime, timezone
 import json
-import requests
-import boto3
-from botocore.exceptions import ClientError
-from PyPDF2 import PdfReader
-from docx import Document
-
-from app.dependencies import SessionDep, get_curr_user
-from app.models.user_model import User
-from app.models.wallet_model import Wallet
+import logging
+import os
+import anyio
+from pydantic import BaseModel
+from sqlalchemy import select, insert
+
+from app.database import AsyncSessionLocal
+from app.dependencies import SessionDep, CurrentUser, get_curr_user
 from app.models.screening_model import Screening
+from app.models.screening_batch_model import ScreeningBatch
+from app.models.cv_model import CV
+from app.services.analysis_cache import stream_cached_analysis
+from app.services.cv_text import get_cv_text
+from app.services.screening_pipeline import ScreeningError, parse_analysis
+from app.services.screening_worker import screening_workers, set_progress, finish_screening, requeue_screening
+from app.services.wallet_ledger import InsufficientCredits, place_hold
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-STORAGE_ENDPOINT = os.getenv("STORAGE_ENDPOINT", "http://127.0.0.1:9000")
-STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "cvs")
-STORAGE_ACCESS_KEY = os.getenv("STORAGE_ACCESS_KEY")
-STORAGE_SECRET_KEY = os.getenv("STORAGE_SECRET_KEY")
-
-s3_client = boto3.client(
-    's3',
-    endpoint_url=STORAGE_ENDPOINT,
-    aws_access_key_id=STORAGE_ACCESS_KEY,
-    aws_secret_access_key=STORAGE_SECRET_KEY,
-    region_name='us-east-1'
-)
+SCREENING_BATCH_MAX_ITEMS = int(os.getenv("SCREENING_BATCH_MAX_ITEMS", 500))
+# Credits stay held while a screening waits in the queue and runs
+SCREENING_CREDIT_HOLD_TTL_SECONDS = int(os.getenv("SCREENING_CREDIT_HOLD_TTL_SECONDS", 6 * 60 * 60))
+# Accounts (e.g. placement cell staff) allowed to screen other users' CVs in bulk
+SCREENING_BATCH_ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("SCREENING_BATCH_ADMIN_EMAILS", "").split(",") if email.strip()
+}
 
 
 class RunScreeningRequest(BaseModel):
     cv_id: int
+    bypass_cache: bool = False
 
-@router.post("/run")
-def run_screening(
-    body: RunScreeningRequest,
-    current_user: Annotated[User, Depends(get_curr_user)],
-    session: SessionDep,
-):
+
+class RunScreeningBatchRequest(BaseModel):
+    cv_ids: Optional[List[int]] = None
+    user_ids: Optional[List[int]] = None
+    bypass_cache: bool = False
+
+async def _create_screening(
+    session: SessionDep, current_user: CurrentUser, body: RunScreeningRequest, **fields
+) -> Screening:
+    """Hold the credit and insert the screening row in one transaction."""
+    cv = await session.scalar(select(CV).where(CV.id == body.cv_id, CV.user_id == current_user.id))
+    if not cv:
+        raise HTTPException(status_code=404, detail="CV not found")
+
+    screening = Screening(
+        user_id=current_user.id,
+        cv_id=body.cv_id,
+        credits_used=1,
+        bypass_cache=body.bypass_cache,
+        **fields,
+    )
+    session.add(screening)
+    await session.flush()
     try:
-        wallet = session.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet or wallet.balance_credits < 1:
-            raise HTTPException(status_code=400, detail="Insufficient credits")
+        screening.hold_id = await place_hold(
+            session, current_user.id, 1,
+            external_ref=f"screening_{screening.id}", ttl_seconds=SCREENING_CREDIT_HOLD_TTL_SECONDS,
+        )
+    except InsufficientCredits:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Insufficient credits")
+    await session.commit()
+    return screening
 
-        wallet.balance_credits -= 1
 
-        from app.models.cv_model import CV
-        cv = session.query(CV).filter(CV.id == body.cv_id, CV.user_id == current_user.id).first()
-        if not cv:
-            raise HTTPException(status_code=404, detail="CV not found")
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        text_content = ""
-        try:
-            storage_url_parts = cv.storage_url.split(f"{STORAGE_BUCKET}/")
-            if len(storage_url_parts) != 2:
-                raise HTTPException(status_code=500, detail="Invalid storage URL format")
-            
-            key = storage_url_parts[1]
-            
-            file_obj = io.BytesIO()
-            s3_client.download_fileobj(STORAGE_BUCKET, key, file_obj)
-            file_obj.seek(0)
-            file_bytes = file_obj.read()
-
-            if cv.filename.lower().endswith('.pdf'):
-                pdf = PdfReader(io.BytesIO(file_bytes))
-                text_content = "\n".join(page.extract_text() or "" for page in pdf.pages)
-            elif cv.filename.lower().endswith('.docx'):
-                doc = Document(io.BytesIO(file_bytes))
-                text_content = "\n".join(p.text for p in doc.paragraphs)
-            else:
-                text_content = file_bytes.decode('utf-8', errors='ignore')
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=f"Failed to read CV file from storage: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to read CV file: {str(e)}")
-
-        github_token = os.getenv("GITHUB_TOKEN")
-        if not github_token:
-            raise HTTPException(status_code=500, detail="GITHUB_TOKEN is not configured for GitHub Models")
-
-        ai_model = os.getenv("AI_MODEL", "openai/gpt-4.1")
-
-        analysis = None
-        try:
-            prompt = (
-                "You are an expert CV screener. Given the resume text below, "
-                "identify the most relevant job roles (3-5), summarize key skills, "
-                "and suggest improvements. Return a JSON with these fields: "
-                "roles (array of strings), skills (array of strings), summary (string), "
-                "and improvements (array of strings)."
-            )
 
-            # Match the working call pattern from your other project:
-            # base "https://models.github.ai/inference" or full "https://models.github.ai/inference/chat/completions"
-            endpoint = os.getenv(
-                "GITHUB_MODELS_ENDPOINT",
-                "https://models.github.ai/inference/chat/completions",
-            )
-            url = endpoint if endpoint.rstrip("/").endswith("chat/completions") else f"{endpoint.rstrip('/')}/chat/completions"
-
-            payload = {
-                "model": ai_model or "openai/gpt-4.1",
-                "messages": [
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text_content[:15000]},
-                ],
-                "temperature": 1,
-                "top_p": 1,
-            }
+async def _stream_screening(screening: Screening) -> AsyncIterator[str]:
+    finished = False
+    error = None
+    try:
+        yield _sse("progress", {"id": screening.id, "progress": "extracting"})
+        async with AsyncSessionLocal() as session:
+            cv = await session.get(CV, screening.cv_id)
+        if not cv:
+            raise ScreeningError("CV not found", retryable=False)
+        text_content = (await get_cv_text(cv)).text
 
-            # Use minimal headers like the GitHub Models quickstart
-            headers = {
-                "Authorization": f"Bearer {github_token}",
-                "Content-Type": "application/json",
-            }
+        await set_progress(screening.id, "analyzing", screening.attempts)
+        yield _sse("progress", {"id": screening.id, "progress": "analyzing"})
+        parts = []
+        async for delta in stream_cached_analysis(text_content, bypass=screening.bypass_cache):
+            parts.append(delta)
+            yield _sse("token", {"content": delta})
 
-            r = requests.post(url, headers=headers, json=payload, timeout=120)
-            r.raise_for_status()
-            data = r.json()
+        analysis = "".join(parts)
+        result = parse_analysis(analysis)
+        await finish_screening(screening.id, analysis=analysis, result=result, attempt=screening.attempts)
+        finished = True
+        yield _sse("done", {"id": screening.id, "status": "done", "result": result.model_dump()})
+        return
+    except ScreeningError as e:
+        error = str(e)
+    except Exception as e:
+        logger.exception("Streaming screening %s failed", screening.id)
+        error = f"Failed to run screening: {str(e)}"
+    finally:
+        if not finished and error is None:
+            # Client disconnected mid-stream; a worker finishes the job instead
+            with anyio.CancelScope(shield=True):
+                await requeue_screening(screening.id)
+            screening_workers.notify()
 
-            analysis = (
-                data.get("choices", [{}])[0]
-                .get("message", {})
-                .get("content", "")
-            )
+    # The client is watching this attempt, so fail (and release) rather than retry
+    if await finish_screening(screening.id, error=error, retry=False, attempt=screening.attempts):
+        yield _sse("error", {"id": screening.id, "status": "failed", "error": error})
+    else:
+        # Finished elsewhere already; GET /screenings/{id} has the outcome
+        yield _sse("error", {"id": screening.id, "error": error})
 
-        except Exception as e:
-            analysis = f"AI analysis failed: {str(e)}"
 
-        screening = Screening(
-            user_id=current_user.id,
-            cv_id=body.cv_id,
-            status="done",
-            credits_used=1,
-        )
-        session.add(screening)
-        session.commit()
-        session.refresh(screening)
+@router.post("/run", status_code=202)
+async def run_screening(
+    body: RunScreeningRequest,
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep,
+):
+    """
+    Queue a CV screening.
+
+    The credit is taken and a pending screening row is created in one
+    transaction; download, extraction and the model call happen in a
+    screening worker. Poll GET /screenings/{id} for progress and result.
+    """
+    try:
+        screening = await _create_screening(session, current_user, body, status="pending", progress="queued")
+        screening_workers.notify()
 
         return {
             "id": screening.id,
             "status": screening.status,
-            "analysis": analysis,
+            "progress": screening.progress,
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to run screening: {str(e)}")
 
 
+@router.post("/run/stream")
+async def run_screening_stream(
+    body: RunScreeningRequest,
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep,
+):
+    """
+    Run a CV screening inline and stream the analysis as server-sent events.
+
+    Emits ``progress`` events, then one ``token`` event per model delta,
+    then ``done`` (or ``error``). The assembled analysis is saved on the
+    screening, so GET /screenings/{id} returns it afterwards.
+    """
+    try:
+        screening = await _create_screening(
+            session, current_user, body,
+            status="running", progress="extracting", attempts=1,
+            started_at=datetime.now(timezone.utc),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to run screening: {str(e)}")
+
+    return StreamingResponse(
+        _stream_screening(screening),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batches", status_code=202)
+async def run_screening_batch(
+    body: RunScreeningBatchRequest,
+    current_user: Annotated[CurrentUser, Depends(get_curr_user)],
+    session: SessionDep,
+):
+    """
+    Queue screenings for many CVs at once.
+
+    Pass ``cv_ids`` (your own CVs, or any CVs for batch admins) or
+    ``user_ids`` (every CV of those users; batch admins only). All credits
+    are taken in one ledger entry and the items are drained by the
+    screening workers. Poll GET /screenings/batches/{id} for progress.
+    """
+    if (body.cv_ids is None) == (body.user_ids is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of cv_ids or user_ids")
+    is_admin = current_user.email.lower() in SCREENING_BATCH_ADMIN_EMAILS
+    if body.user_ids is not None and not is_admin:
+        raise HTTPException(status_code=403, detail="Only batch admins can screen by user_ids")
+
+    try:
+        stmt = select(CV.id, CV.user_id)
+        if body.cv_ids is not None:
+            stmt = stmt.where(CV.id.in_(set(body.cv_ids)))
+            if not is_admin:
+                stmt = stmt.where(CV.user_id == current_user.id)
+        else:
+            stmt = stmt.where(CV.user_id.in_(set(body.user_ids)))
+        cvs = (await session.execute(stmt.order_by(CV.id))).all()
+
+        if body.cv_ids is not None and len(cvs) != len(set(body.cv_ids)):
+            raise HTTPException(status_code=404, detail="CV not found")
+        if not cvs:
+            raise HTTPException(status_code=400, detail="No CVs to screen")
+        if len(cvs) > SCREENING_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"A batch can hold at most {SCREENING_BATCH_MAX_ITEMS} CVs")
+
+        credits = len(cvs)
+        batch = ScreeningBatch(user_id=current_user.id, total=len(cvs), credits_used=credits)
+        session.add(batch)
+        await session.flush()
+        try:
+            hold_id = await place_hold(
+                session, current_user.id, credits,
+                external_ref=f"screening_batch_{batch.id}", ttl_seconds=SCREENING_CREDIT_HOLD_TTL_SECONDS,
+            )
+        except InsufficientCredits:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Insufficient credits")
+        await session.execute(insert(Screening), [
+            {
+                "user_id": cv.user_id,
+                "cv_id": cv.id,
+                "batch_id": batch.id,
+                "hold_id": hold_id,
+                "status": "pending",
+                "progress": "queued",
+                "credits_used": 1,
+                "bypass_cache": body.bypass_cache,
+            }
+            for cv in cvs
+        ])
+        await session.commit()
+        screening_workers.notify()
+
+        return {"id": batch.id, "total": batch.total, "credits_used": batch.credits_used, "status": "running"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to run screening batch: {str(e)}")
+
+
+@router.get("/batches/{batch_id}")
+async def get_screening_batch(batch_id: int, current_user: Annotated[CurrentUser, Depends(get_curr_user)], session: SessionDep):
+    batch = await session.scalar(
+        select(ScreeningBatch)
+        .where(ScreeningBatch.id == batch_id, ScreeningBatch.user_id == current_user.id)
+    )
+    if not batch:
+        raise HTTPException(status_code=404, detail="Screening batch not found")
+
+    items = (await session.execute(
+        select(
+            Screening.id, Screening.cv_id, Screening.user_id, Screening.status,
+            Screening.progress, Screening.attempts, Screening.error, Screening.finished_at,
+        )
+        .where(Screening.batch_id == batch.id)
+        .order_by(Screening.id)
+    )).all()
+    counts = Counter(item.status for item in items)
+    completed = counts["done"] + counts["failed"]
+    if completed < batch.total:
+        status = "running"
+    else:
+        status = "completed_with_errors" if counts["failed"] else "completed"
+
+    return {
+        "id": batch.id,
+        "status": status,
+        "total": batch.total,
+        "completed": completed,
+        "counts": {key: counts[key] for key in ("pending", "running", "done", "failed")},
+        "credits_used": batch.credits_used,
+        "created_at": batch.created_at,
+        "items": [
+            {
+                "screening_id": item.id,
+                "cv_id": item.cv_id,
+                "user_id": item.user_id,
+                "status": item.status,
+                "progress": item.progress,
+                "attempts": item.attempts,
+                "error": item.error,
+                "finished_at": item.finished_at,
+            }
+            for item in items
+        ],
+    }
+
+
 @router.get("/{screening_id}")
-def get_screening(screening_id: int, current_user: Annotated[User, Depends(get_curr_user)], session: SessionDep):
-    screening = (
-        session.query(Screening)
-        .filter(Screening.id == screening_id, Screening.user_id == current_user.id)
-        .first()
+async def get_screening(screening_id: int, current_user: Annotated[CurrentUser, Depends(get_curr_user)], session: SessionDep):
+    screening = await session.scalar(
+        select(Screening)
+        .where(Screening.id == screening_id, Screening.user_id == current_user.id)
     )
     if not screening:
         raise HTTPException(status_code=404, detail="Screening not found")
     return {
         "id": screening.id,
         "cv_id": screening.cv_id,
+        "batch_id": screening.batch_id,
         "status": screening.status,
+        "progress": screening.progress,
+        "attempts": screening.attempts,
+        "analysis": screening.analysis,
+        "result": screening.result,
+        "error": screening.error,
         "credits_used": screening.credits_used,
         "created_at": screening.created_at,
+        "started_at": screening.started_at,
+        "finished_at": screening.finished_at,
     }
-
-
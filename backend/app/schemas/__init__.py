@@ -35,6 +35,11 @@ from .payment_schemas import (
     TransactionListResponse
 )
 
+from .screening_schemas import (
+    ScreeningResult,
+    PersonaResponse
+)
+
 __all__ = [
     "CreateUser",
     "LoginUser", 
@@ -60,5 +65,7 @@ __all__ = [
     "PaymentOrderRequest",
     "PaymentOrderResponse",
     "CreditPackResponse",
-    "TransactionListResponse"
+    "TransactionListResponse",
+    "ScreeningResult",
+    "PersonaResponse"
 ]
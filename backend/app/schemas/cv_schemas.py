@@ -35,4 +35,6 @@ class CVDownloadResponse(BaseModel):
 
 class CVListResponse(BaseModel):
     cvs: List[CVResponse]
-    total: int
+    # From the per-user counter; None when include_total=false
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
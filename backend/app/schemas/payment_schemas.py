@@ -5,6 +5,8 @@ from decimal import Decimal
 
 class WalletResponse(BaseModel):
     balance_credits: int
+    # Reserved by screenings/interviews still running; not in balance_credits
+    held_credits: int = 0
     last_transactions: List['TransactionResponse']
 
 class TransactionResponse(BaseModel):
@@ -35,7 +37,9 @@ class CreditPackResponse(BaseModel):
 
 class TransactionListResponse(BaseModel):
     transactions: List[TransactionResponse]
-    total: int
+    # From the per-user counter; None when include_total=false
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 
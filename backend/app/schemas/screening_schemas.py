@@ -0,0 +1,26 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, List
+from datetime import datetime
+
+
+class ScreeningResult(BaseModel):
+    roles: List[str] = []
+    skills: List[str] = []
+    summary: str = ""
+    improvements: List[str] = []
+
+    @field_validator("roles", "skills", "improvements")
+    @classmethod
+    def clean_items(cls, items: List[str]) -> List[str]:
+        seen = set()
+        cleaned = []
+        for item in (str(i).strip() for i in items):
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                cleaned.append(item)
+        return cleaned
+
+class PersonaResponse(BaseModel):
+    summary: Optional[dict]
+    skills: List[str]
+    updated_at: datetime
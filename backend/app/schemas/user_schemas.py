@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, constr
 from typing import Optional, List
 from datetime import datetime
+from .screening_schemas import PersonaResponse
 
 class CreateUser(BaseModel):
     name: constr(min_length=3, max_length=50)
@@ -45,6 +46,7 @@ class UserWithProfile(BaseModel):
     user: UserResponse
     profile: Optional[UserProfileResponse]
     wallet_balance: int
+    persona: Optional[PersonaResponse] = None
 
 
             
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.activity_model import Activity
+from app.models.transaction_model import Transaction
+
+
+def record_activity(
+    session: AsyncSession,
+    user_id: int,
+    kind: str,
+    message: str,
+    ref_id: Optional[str] = None,
+) -> Activity:
+    """Append one event to the user's activity stream.
+
+    The row is only added to the session; it is committed together with
+    the write that produced it.
+    """
+    activity = Activity(user_id=user_id, kind=kind, ref_id=ref_id, message=message[:255])
+    session.add(activity)
+    return activity
+
+
+def record_transaction_activity(session: AsyncSession, transaction: Transaction) -> Activity:
+    """Stream entry for a wallet transaction; the transaction must be flushed."""
+    return record_activity(
+        session,
+        transaction.user_id,
+        kind=f"transaction_{transaction.type}",
+        message=f"{transaction.type.capitalize()} {transaction.credits} credits",
+        ref_id=str(transaction.id),
+    )
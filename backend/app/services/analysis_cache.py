@@ -0,0 +1,134 @@
+"""Persistent cache of model analyses.
+
+Keyed by (normalized text hash, model, prompt version, temperature), so
+re-screening an unchanged CV with the same model and prompt is answered
+from the database instead of another model round trip.
+"""
+import logging
+import os
+import threading
+from typing import AsyncIterator, Optional
+from sqlalchemy import update, func
+from sqlalchemy.dialects.postgresql import insert
+from app.database import AsyncSessionLocal
+from app.models.analysis_cache_model import AnalysisCache
+from app.services.rate_limit import provider_limiter
+from app.services.screening_pipeline import ScreeningError, analysis_cache_key, analyze_cv_text, parse_analysis, stream_analysis
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+
+
+class AnalysisCacheStats:
+    """Process-local hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": ANALYSIS_CACHE_ENABLED,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+analysis_cache_stats = AnalysisCacheStats()
+
+
+def _key_clause(key: tuple[str, str, str, float]):
+    text_hash, model, prompt_version, temperature = key
+    return (
+        AnalysisCache.text_hash == text_hash,
+        AnalysisCache.model == model,
+        AnalysisCache.prompt_version == prompt_version,
+        AnalysisCache.temperature == temperature,
+    )
+
+
+async def _lookup(key: tuple[str, str, str, float]):
+    async with AsyncSessionLocal() as session:
+        analysis = await session.scalar(
+            update(AnalysisCache)
+            .where(*_key_clause(key))
+            .values(hit_count=AnalysisCache.hit_count + 1, last_hit_at=func.now())
+            .returning(AnalysisCache.analysis)
+        )
+        await session.commit()
+        return analysis
+
+
+async def _store(key: tuple[str, str, str, float], analysis: str) -> None:
+    text_hash, model, prompt_version, temperature = key
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(AnalysisCache)
+            .values(text_hash=text_hash, model=model, prompt_version=prompt_version, temperature=temperature, analysis=analysis)
+            .on_conflict_do_update(constraint='uq_analysis_cache_key', set_={"analysis": analysis, "created_at": func.now()})
+        )
+        await session.commit()
+
+
+async def _cached(key: tuple[str, str, str, float], bypass: bool) -> Optional[str]:
+    if bypass or not ANALYSIS_CACHE_ENABLED:
+        analysis_cache_stats.record("bypassed")
+        return None
+    analysis = await _lookup(key)
+    analysis_cache_stats.record("hits" if analysis is not None else "misses")
+    return analysis
+
+
+async def _store_quietly(key: tuple[str, str, str, float], analysis: str) -> None:
+    try:
+        # Never cache an answer that a retry should get another shot at
+        parse_analysis(analysis)
+    except ScreeningError:
+        return
+    try:
+        await _store(key, analysis)
+    except Exception:
+        # A cache write failure must not fail a paid screening
+        logger.exception("Failed to store analysis in cache")
+
+
+async def cached_analysis(text_content: str, bypass: bool = False) -> str:
+    """Analyze `text_content`, answering from the cache when possible.
+
+    With ``bypass`` (or the cache disabled) the model is always called;
+    the fresh result still replaces the cached one.
+    """
+    key = analysis_cache_key(text_content)
+    analysis = await _cached(key, bypass)
+    if analysis is not None:
+        return analysis
+    await provider_limiter.acquire("github_models")
+    analysis = await analyze_cv_text(text_content)
+    await _store_quietly(key, analysis)
+    return analysis
+
+
+async def stream_cached_analysis(text_content: str, bypass: bool = False) -> AsyncIterator[str]:
+    """Streaming `cached_analysis`: a cache hit is yielded as a single chunk."""
+    key = analysis_cache_key(text_content)
+    analysis = await _cached(key, bypass)
+    if analysis is not None:
+        yield analysis
+        return
+    await provider_limiter.acquire("github_models")
+    parts = []
+    async for delta in stream_analysis(text_content):
+        parts.append(delta)
+        yield delta
+    await _store_quietly(key, "".join(parts))
@@ -0,0 +1,132 @@
+"""Fit extracted CV text into the model's prompt budget.
+
+Normalizes whitespace, drops headers and footers repeated across pages,
+splits the CV into sections by their headings and packs the most useful
+sections into ``token_budget`` tokens. Sections keep their original order
+in the output; only what is included depends on priority.
+"""
+import re
+from collections import Counter
+
+PAGE_BREAK = "\f"
+# Rough size of a token for English CV text; no tokenizer is bundled
+CHARS_PER_TOKEN = 4
+
+SECTION_PATTERNS = [
+    ("experience", r"(work |professional )?experience|employment( history)?|work history|internships?"),
+    ("skills", r"(technical |key |core )?skills|technologies|tech stack|competencies"),
+    ("projects", r"(academic |personal |key )?projects"),
+    ("education", r"education|academics?|qualifications"),
+    ("summary", r"(professional )?summary|profile|objective|about me"),
+    ("certifications", r"certifications?|courses|licenses"),
+    ("achievements", r"achievements|awards|honou?rs|accomplishments"),
+    ("publications", r"publications|research"),
+    ("interests", r"interests|hobbies|extra[- ]?curricular( activities)?|activities"),
+    ("references", r"references|declaration"),
+]
+# Most relevant first; "header" is the text before the first heading (name, contact)
+SECTION_PRIORITY = [
+    "experience", "skills", "projects", "education", "summary", "header",
+    "certifications", "achievements", "other", "publications", "interests", "references",
+]
+HEADING_MAX_CHARS = 40
+# A line that does not fit is cut to the remaining budget, unless that leaves less than this
+MIN_TRUNCATED_LINE_CHARS = 80
+
+_HEADINGS = [(name, re.compile(rf"^\W*(?:{pattern})\W*$", re.IGNORECASE)) for name, pattern in SECTION_PATTERNS]
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def _edge_signature(line: str) -> str:
+    # Page numbers differ per page; compare the rest of the line
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def _strip_repeated_edges(pages: list[list[str]], edge_lines: int = 2) -> list[list[str]]:
+    if len(pages) < 2:
+        return pages
+    counts = Counter()
+    for lines in pages:
+        counts.update({_edge_signature(line) for line in lines[:edge_lines] + lines[-edge_lines:]})
+    repeated = {sig for sig, seen in counts.items() if seen >= max(2, len(pages) / 2)}
+
+    stripped = []
+    for page_number, lines in enumerate(pages):
+        # The first page keeps its header once (it is often the candidate's name)
+        head = [line for line in lines[:edge_lines] if page_number == 0 or _edge_signature(line) not in repeated]
+        tail = lines[edge_lines:]
+        if len(lines) > edge_lines:
+            keep = len(tail) - min(edge_lines, len(tail))
+            tail = tail[:keep] + [line for line in tail[keep:] if _edge_signature(line) not in repeated]
+        stripped.append(head + tail)
+    return stripped
+
+
+def _section_name(line: str) -> str | None:
+    if len(line) > HEADING_MAX_CHARS:
+        return None
+    for name, pattern in _HEADINGS:
+        if pattern.match(line):
+            return name
+    return None
+
+
+def split_sections(text: str) -> list[tuple[str, list[str]]]:
+    """Clean the text and return ``(section name, lines)`` in document order."""
+    pages = [
+        [line for line in map(_normalize_line, page.split("\n")) if line]
+        for page in text.split(PAGE_BREAK)
+    ]
+    pages = _strip_repeated_edges(pages)
+
+    sections: list[tuple[str, list[str]]] = [("header", [])]
+    for lines in pages:
+        for line in lines:
+            if _PAGE_NUMBER.match(line):
+                continue
+            name = _section_name(line)
+            if name:
+                sections.append((name, [line]))
+            else:
+                sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def _priority(name: str) -> int:
+    return SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else SECTION_PRIORITY.index("other")
+
+
+def compact_cv_text(text: str, token_budget: int) -> str:
+    """Return the most relevant parts of `text` within `token_budget` tokens."""
+    sections = split_sections(text)
+    remaining = token_budget * CHARS_PER_TOKEN
+    chosen: dict[int, list[str]] = {}
+    for index in sorted(range(len(sections)), key=lambda i: _priority(sections[i][0])):
+        kept = []
+        for line in sections[index][1]:
+            # +1 for the joining newline
+            if len(line) + 1 > remaining:
+                if remaining - 1 < MIN_TRUNCATED_LINE_CHARS:
+                    # A shorter line further on may still fit
+                    continue
+                # One long line (common for PDFs and plain text) is cut, not dropped
+                line = line[:remaining - 1].rsplit(" ", 1)[0] or line[:remaining - 1]
+            kept.append(line)
+            remaining -= len(line) + 1
+        if kept:
+            chosen[index] = kept
+        if remaining <= 0:
+            break
+    compacted = "\n".join(line for index in sorted(chosen) for line in chosen[index])
+    if not compacted:
+        # Nothing survived sectioning; the start of the text beats an empty prompt
+        compacted = _normalize_line(text.replace(PAGE_BREAK, " "))[:token_budget * CHARS_PER_TOKEN]
+    return compacted
@@ -0,0 +1,64 @@
+"""Extracted CV text, stored once per CV.
+
+Text is keyed by the storage object's ETag (or a SHA-256 of its bytes
+when storage does not report one) plus the extractor version, so it is
+only re-extracted when the file or the extractor changes. Extraction
+stops at EXTRACT_CHAR_BUDGET, so only that much of a long CV is kept.
+"""
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from app.database import AsyncSessionLocal
+from app.models.cv_model import CV
+from app.models.cv_text_model import CVText
+from app.services.extraction_pool import extraction_pool
+from app.services.screening_pipeline import EXTRACTOR_VERSION, head_cv_etag, download_cv
+
+
+def _is_current(stored: CVText, content_key: str) -> bool:
+    return stored.content_key == content_key and stored.extractor_version == EXTRACTOR_VERSION
+
+
+async def get_cv_text(cv: CV, verify: bool = True) -> CVText:
+    """Return stored text for `cv`, extracting and persisting it on a miss.
+
+    With ``verify`` the object's ETag is checked against storage first;
+    without it any row from the current extractor is trusted as-is.
+    Uses its own short sessions for the lookup and the store, so no pool
+    connection is held while the file is downloaded and parsed; callers
+    should not hold one either.
+    """
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(select(CVText).where(CVText.cv_id == cv.id))
+    if stored and not verify and stored.extractor_version == EXTRACTOR_VERSION:
+        return stored
+    etag = await run_in_threadpool(head_cv_etag, cv.storage_url)
+    if stored and etag and _is_current(stored, f"etag:{etag}"):
+        return stored
+
+    file_obj, sha256 = await run_in_threadpool(download_cv, cv.storage_url)
+    try:
+        content_key = f"etag:{etag}" if etag else f"sha256:{sha256}"
+        if stored and _is_current(stored, content_key):
+            return stored
+        text, page_count = await extraction_pool.extract(cv.filename, file_obj.name)
+    finally:
+        file_obj.close()
+    values = {
+        "content_key": content_key,
+        "extractor_version": EXTRACTOR_VERSION,
+        "text": text,
+        "page_count": page_count,
+        "char_count": len(text),
+    }
+    stmt = (
+        insert(CVText)
+        .values(cv_id=cv.id, **values)
+        .on_conflict_do_update(index_elements=[CVText.cv_id], set_={**values, "updated_at": func.now()})
+        .returning(CVText)
+        .execution_options(populate_existing=True)
+    )
+    async with AsyncSessionLocal() as session:
+        row = await session.scalar(stmt)
+        await session.commit()
+    return row
@@ -0,0 +1,88 @@
+"""Process pool for CV text extraction.
+
+PDF and DOCX parsing is pure Python and CPU-bound, so it runs in worker
+processes to stay off the event loop and out of the API's GIL. Workers
+are recycled after EXTRACTION_MAX_TASKS_PER_CHILD tasks to cap parser
+memory growth.
+
+Extraction checks CV_EXTRACT_TIMEOUT_SECONDS itself between pages, so a
+slow file normally fails from inside the worker. If a task still has not
+returned after twice that (a parser stuck inside one page), or a worker
+dies, new submissions go to a fresh executor while the old one is shut
+down without waiting: its other in-flight tasks still finish and its
+processes exit once they are idle.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.services.screening_pipeline import CV_EXTRACT_TIMEOUT_SECONDS, ScreeningError, extract_cv_file
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 2))
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", 50))
+
+
+class ExtractionPool:
+    def __init__(
+        self,
+        workers: int = EXTRACTION_WORKERS,
+        # Includes time queued behind other extractions
+        timeout: float = 2 * CV_EXTRACT_TIMEOUT_SECONDS,
+        max_tasks_per_child: int = EXTRACTION_MAX_TASKS_PER_CHILD,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # max_tasks_per_child needs a non-fork start method
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _replace(self, executor: ProcessPoolExecutor) -> None:
+        """Route new submissions to a fresh executor; work already on ``executor`` runs to completion."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    async def extract(self, filename: str, path: str) -> tuple[str, Optional[int]]:
+        if self.workers <= 0:
+            return await run_in_threadpool(extract_cv_file, filename, path)
+
+        executor = self._get_executor()
+        future = asyncio.get_running_loop().run_in_executor(executor, extract_cv_file, filename, path)
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Extraction of %s timed out; replacing extraction pool", filename)
+            self._replace(executor)
+            raise ScreeningError("CV text extraction timed out")
+        except BrokenProcessPool:
+            logger.warning("Extraction worker died on %s; replacing extraction pool", filename)
+            self._replace(executor)
+            raise ScreeningError("CV text extraction failed")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+extraction_pool = ExtractionPool()
@@ -0,0 +1,118 @@
+"""OpenID Connect discovery, JWKS caching and local id_token verification.
+
+Discovery documents and signing keys are cached per provider and
+refreshed after OIDC_CACHE_TTL_SECONDS, or early when a token is signed
+with a key id we have not seen (key rotation). Verifying the id_token
+locally saves the userinfo round trip on every social login.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+from jose import jwt, JWTError
+from app.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+OIDC_CACHE_TTL_SECONDS = int(os.getenv("OIDC_CACHE_TTL_SECONDS", 3600))
+# Minimum gap between forced JWKS refreshes triggered by unknown key ids
+OIDC_JWKS_MIN_REFRESH_SECONDS = 60
+OIDC_CLOCK_SKEW_SECONDS = 120
+# Only public-key algorithms: "none" and HMAC (keyed with public JWKS material) are never accepted
+OIDC_ALLOWED_ALGORITHMS = ("RS256", "RS384", "RS512", "PS256", "PS384", "PS512", "ES256", "ES384", "ES512")
+
+
+class OIDCProvider:
+    def __init__(self, name: str, discovery_url: str, client_id: Optional[str], extra_issuers: tuple[str, ...] = ()):
+        self.name = name
+        self.discovery_url = discovery_url
+        self.client_id = client_id
+        self.extra_issuers = extra_issuers
+        self._metadata: Optional[dict] = None
+        self._metadata_at = 0.0
+        self._jwks: Optional[dict] = None
+        self._jwks_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _get_json(self, url: str) -> dict:
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        return response.json()
+
+    async def metadata(self) -> dict:
+        async with self._lock:
+            if self._metadata is None or time.monotonic() - self._metadata_at > OIDC_CACHE_TTL_SECONDS:
+                self._metadata = await self._get_json(self.discovery_url)
+                self._metadata_at = time.monotonic()
+            return self._metadata
+
+    async def jwks(self, force: bool = False) -> dict:
+        metadata = await self.metadata()
+        async with self._lock:
+            age = time.monotonic() - self._jwks_at
+            stale = self._jwks is None or age > OIDC_CACHE_TTL_SECONDS
+            if stale or (force and age > OIDC_JWKS_MIN_REFRESH_SECONDS):
+                self._jwks = await self._get_json(metadata["jwks_uri"])
+                self._jwks_at = time.monotonic()
+            return self._jwks
+
+    async def _signing_key(self, kid: Optional[str]) -> dict:
+        for force in (False, True):
+            keys = (await self.jwks(force=force)).get("keys", [])
+            if kid is None:
+                # Without a kid the key is only unambiguous if there is exactly one
+                if len(keys) == 1:
+                    return keys[0]
+                continue
+            for key in keys:
+                if key.get("kid") == kid:
+                    return key
+        raise JWTError(f"No {self.name} signing key matches kid {kid}")
+
+    async def _algorithms(self) -> list[str]:
+        """Algorithms the provider advertises for id_tokens, limited to OIDC_ALLOWED_ALGORITHMS."""
+        advertised = (await self.metadata()).get("id_token_signing_alg_values_supported") or ["RS256"]
+        return [alg for alg in advertised if alg in OIDC_ALLOWED_ALGORITHMS]
+
+    async def verify_id_token(self, id_token: str) -> dict:
+        """Return the claims of a valid id_token, or raise JWTError."""
+        header = jwt.get_unverified_header(id_token)
+        key = await self._signing_key(header.get("kid"))
+        claims = jwt.decode(
+            id_token,
+            key,
+            # Pinned by us, never taken from the unverified header
+            algorithms=await self._algorithms(),
+            audience=self.client_id,
+            # Checked below: multi-tenant issuers are templated on the tenant id
+            options={"verify_iss": False, "verify_at_hash": False, "leeway": OIDC_CLOCK_SKEW_SECONDS},
+        )
+        issuer = (await self.metadata())["issuer"].replace("{tenantid}", str(claims.get("tid", "")))
+        if claims.get("iss") not in (issuer, *self.extra_issuers):
+            raise JWTError(f"Unexpected {self.name} issuer {claims.get('iss')}")
+        return claims
+
+    async def claims_from_tokens(self, tokens: dict) -> Optional[dict]:
+        """Verified id_token claims from a token response, or None to fall back to userinfo."""
+        id_token = tokens.get("id_token")
+        if not id_token:
+            return None
+        try:
+            return await self.verify_id_token(id_token)
+        except Exception as e:
+            logger.warning("%s id_token verification failed, using userinfo: %s", self.name, e)
+            return None
+
+
+google_oidc = OIDCProvider(
+    "google",
+    "https://accounts.google.com/.well-known/openid-configuration",
+    os.getenv("GOOGLE_CLIENT_ID"),
+    extra_issuers=("accounts.google.com",),
+)
+microsoft_oidc = OIDCProvider(
+    "microsoft",
+    f"https://login.microsoftonline.com/{os.getenv('MICROSOFT_TENANT_ID', 'common')}/v2.0/.well-known/openid-configuration",
+    os.getenv("MICROSOFT_CLIENT_ID"),
+)
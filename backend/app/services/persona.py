@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.persona_model import Persona
+from app.schemas.screening_schemas import ScreeningResult
+
+MAX_PERSONA_SKILLS = 50
+
+
+async def merge_screening_result(session: AsyncSession, user_id: int, result: ScreeningResult, screening_id: int) -> Persona:
+    """Fold a screening result into the user's persona; the caller commits.
+
+    The latest screening replaces the summary, roles and improvements;
+    skills accumulate, newest first, without case-insensitive duplicates.
+    """
+    persona = await session.scalar(
+        select(Persona).where(Persona.user_id == user_id).order_by(Persona.id).limit(1).with_for_update()
+    )
+    if not persona:
+        persona = Persona(user_id=user_id)
+        session.add(persona)
+
+    skills = []
+    seen = set()
+    for skill in result.skills + list(persona.skills or []):
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    persona.skills = skills[:MAX_PERSONA_SKILLS]
+    persona.summary = {
+        "summary": result.summary,
+        "roles": result.roles,
+        "improvements": result.improvements,
+        "screening_id": screening_id,
+    }
+    return persona
@@ -0,0 +1,55 @@
+"""Per-provider rate limits for outbound model calls.
+
+Configured as ``PROVIDER_RATE_LIMITS="github_models=15/60"`` (calls per
+seconds, comma separated). Limits are per process; size them for the
+number of API and worker processes sharing the provider quota.
+"""
+import asyncio
+import os
+import time
+
+
+def parse_rate_limits(spec: str) -> dict[str, tuple[int, float]]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        calls, _, seconds = rate.partition("/")
+        limits[name.strip()] = (int(calls), float(seconds or 1))
+    return limits
+
+
+PROVIDER_RATE_LIMITS = parse_rate_limits(os.getenv("PROVIDER_RATE_LIMITS", "github_models=15/60"))
+
+
+class TokenBucket:
+    def __init__(self, calls: int, seconds: float):
+        self.capacity = calls
+        self.refill_per_second = calls / seconds
+        self.tokens = float(calls)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_second)
+
+
+class ProviderRateLimiter:
+    def __init__(self, limits: dict[str, tuple[int, float]]):
+        self._buckets = {name: TokenBucket(calls, seconds) for name, (calls, seconds) in limits.items()}
+
+    async def acquire(self, provider: str) -> None:
+        """Wait for a call slot; providers without a configured limit pass straight through."""
+        bucket = self._buckets.get(provider)
+        if bucket is not None:
+            await bucket.acquire()
+
+
+provider_limiter = ProviderRateLimiter(PROVIDER_RATE_LIMITS)
@@ -0,0 +1,120 @@
+"""Refresh token store.
+
+Refresh tokens live in their own table, one row per issued token, so
+logins and refreshes never write the users row and a user can hold one
+session per device. Only a hash of each token is stored. Every refresh
+revokes the presented token and issues a successor in the same family;
+if an already-rotated token is presented again it has leaked, and the
+whole family is revoked.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import create_refresh_token
+from app.database import AsyncSessionLocal
+from app.models.refresh_token_model import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS = int(os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS", 3600))
+DEVICE_LABEL_MAX_LENGTH = 255
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(
+    session: AsyncSession,
+    user_id: int,
+    subject: str,
+    family_id: Optional[str] = None,
+    device_label: Optional[str] = None,
+) -> str:
+    """Add a new token row to the session (the caller commits) and return the token."""
+    expires_delta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    # jti keeps tokens issued in the same second distinct
+    token = create_refresh_token(data={"sub": subject, "jti": uuid.uuid4().hex}, expires_delta=expires_delta)
+    session.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        device_label=(device_label or None) and device_label[:DEVICE_LABEL_MAX_LENGTH],
+        expires_at=datetime.now(timezone.utc) + expires_delta,
+    ))
+    return token
+
+
+async def rotate_refresh_token(session: AsyncSession, token: str) -> Optional[Row]:
+    """Revoke a live token and return its (user_id, family_id, device_label).
+
+    Returns None when the token is unknown, expired or already revoked.
+    The caller issues the successor in the same transaction.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.now(timezone.utc)
+    current = (await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id, RefreshToken.device_label)
+    )).first()
+    if current is not None:
+        return current
+
+    reused_family = await session.scalar(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_not(None))
+    )
+    if reused_family is not None:
+        logger.warning("Rotated refresh token reused; revoking family %s", reused_family)
+        await revoke_refresh_family(session, reused_family)
+        await session.commit()
+    return None
+
+
+async def revoke_refresh_family(session: AsyncSession, family_id: str) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+async def revoke_refresh_token(session: AsyncSession, token: str) -> Optional[int]:
+    """End the session (token family) a token belongs to; returns its user id."""
+    row = (await session.execute(
+        select(RefreshToken.user_id, RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )).first()
+    if row is None:
+        return None
+    await revoke_refresh_family(session, row.family_id)
+    return row.user_id
+
+
+async def sweep_expired_refresh_tokens() -> int:
+    """Delete expired tokens; revoked ones are kept until then for reuse detection."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc))
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def sweep_refresh_tokens_forever(interval: float = REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS) -> None:
+    while True:
+        try:
+            swept = await sweep_expired_refresh_tokens()
+            if swept:
+                logger.info("Swept %s expired refresh token(s)", swept)
+        except Exception:
+            logger.exception("Failed to sweep refresh tokens")
+        await asyncio.sleep(interval)
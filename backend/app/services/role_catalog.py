@@ -0,0 +1,133 @@
+"""In-memory snapshot of the active role catalog.
+
+Roles change rarely (seeded defaults plus the odd manual edit) but are
+read on every ``GET /roles`` and whenever a request names a role, so each
+API process keeps an immutable snapshot of the active rows and swaps in a
+new one when a periodic reload sees a change. ``GET /roles`` is served
+from the snapshot's pre-rendered body and answers ``If-None-Match`` with
+304; the ETag is a hash of the content, so every process agrees on it.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+from sqlalchemy import select, text
+from app.database import AsyncSessionLocal
+from app.models.role_model import Role
+
+logger = logging.getLogger(__name__)
+
+ROLE_CATALOG_REFRESH_SECONDS = float(os.getenv("ROLE_CATALOG_REFRESH_SECONDS", 60))
+# Any constant works; it only serializes concurrent seeding across processes
+ROLE_SEED_LOCK_ID = 0x526F6C65
+
+DEFAULT_ROLES = [
+    {
+        "title": "Software Engineer",
+        "description": "Design, develop, and maintain software systems.",
+        "tags": ["software", "engineer", "backend", "frontend"],
+    },
+    {
+        "title": "Data Analyst",
+        "description": "Analyze data to produce insights and dashboards.",
+        "tags": ["data", "analyst", "sql", "excel"],
+    },
+    {
+        "title": "Cybersecurity Specialist",
+        "description": "Protect systems and networks from security threats.",
+        "tags": ["security", "cyber", "network", "siem"],
+    },
+    {
+        "title": "Product Manager",
+        "description": "Lead product strategy and execution.",
+        "tags": ["product", "management", "roadmap"],
+    },
+    {
+        "title": "Business Analyst",
+        "description": "Gather requirements and improve business processes.",
+        "tags": ["business", "analyst", "process"],
+    },
+    {
+        "title": "AI/ML Engineer",
+        "description": "Build AI/ML models and deploy them to production.",
+        "tags": ["ai", "ml", "python", "mlops"],
+    },
+]
+
+
+@dataclass(frozen=True)
+class RoleInfo:
+    id: int
+    title: str
+    description: str
+    tags: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    version: int
+    roles: tuple[RoleInfo, ...]
+    by_id: Mapping[int, RoleInfo]
+    # GET /roles response, rendered once per snapshot
+    body: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, version: int, roles: tuple[RoleInfo, ...]) -> "RoleSnapshot":
+        body = json.dumps(
+            [
+                {"id": r.id, "title": r.title, "description": r.description, "tags": list(r.tags), "is_active": True}
+                for r in roles
+            ],
+            separators=(",", ":"),
+        ).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return cls(version, roles, MappingProxyType({r.id: r for r in roles}), body, etag)
+
+
+class RoleCatalog:
+    def __init__(self):
+        self._snapshot = RoleSnapshot.build(0, ())
+
+    @property
+    def snapshot(self) -> RoleSnapshot:
+        return self._snapshot
+
+    def get(self, role_id: Optional[int]) -> Optional[RoleInfo]:
+        """The active role with this id, or None if it does not exist or is inactive."""
+        return self._snapshot.by_id.get(role_id)
+
+    async def seed_defaults(self) -> int:
+        """Insert any DEFAULT_ROLES missing by title; safe to run from every process at startup."""
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ROLE_SEED_LOCK_ID})
+            existing = set((await session.scalars(select(Role.title))).all())
+            missing = [item for item in DEFAULT_ROLES if item["title"] not in existing]
+            session.add_all(Role(title=item["title"], description=item["description"], tags=item["tags"]) for item in missing)
+            await session.commit()
+        return len(missing)
+
+    async def load(self) -> bool:
+        """Reload active roles; swaps in a new snapshot only if something changed."""
+        async with AsyncSessionLocal() as session:
+            rows = (await session.scalars(select(Role).where(Role.is_active == True).order_by(Role.id))).all()
+        roles = tuple(RoleInfo(r.id, r.title, r.description, tuple(r.tags or ())) for r in rows)
+        if roles == self._snapshot.roles:
+            return False
+        self._snapshot = RoleSnapshot.build(self._snapshot.version + 1, roles)
+        return True
+
+    async def refresh_forever(self, interval: float = ROLE_CATALOG_REFRESH_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Failed to reload role catalog")
+
+
+role_catalog = RoleCatalog()
@@ -0,0 +1,361 @@
+import base64
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import time
+import zipfile
+import zlib
+from itertools import islice
+from typing import IO, AsyncIterator, Iterator, Optional
+import boto3
+from botocore.exceptions import ClientError
+import httpx
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject
+from docx import Document
+from pydantic import ValidationError
+from app.http_client import get_http_client
+from app.schemas.screening_schemas import ScreeningResult
+from app.services.cv_compaction import PAGE_BREAK, compact_cv_text
+
+
+STORAGE_ENDPOINT = os.getenv("STORAGE_ENDPOINT", "http://127.0.0.1:9000")
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "cvs")
+STORAGE_ACCESS_KEY = os.getenv("STORAGE_ACCESS_KEY")
+STORAGE_SECRET_KEY = os.getenv("STORAGE_SECRET_KEY")
+
+s3_client = boto3.client(
+    's3',
+    endpoint_url=STORAGE_ENDPOINT,
+    aws_access_key_id=STORAGE_ACCESS_KEY,
+    aws_secret_access_key=STORAGE_SECRET_KEY,
+    region_name='us-east-1'
+)
+
+# Bump whenever extract_cv_text changes output so stored text is re-extracted
+EXTRACTOR_VERSION = "3"
+
+# Normalized characters extracted per CV; compaction picks from these
+EXTRACT_CHAR_BUDGET = int(os.getenv("EXTRACT_CHAR_BUDGET", 60000))
+# Tokens of (compacted) CV text sent to the model
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 3000))
+# Hard limits so a crafted file cannot exhaust memory or a worker; pages
+# past CV_MAX_PAGES are not read, like text past EXTRACT_CHAR_BUDGET
+CV_MAX_DOWNLOAD_BYTES = int(os.getenv("CV_MAX_DOWNLOAD_BYTES", 10 * 1024 * 1024))
+CV_MAX_PAGES = int(os.getenv("CV_MAX_PAGES", 50))
+CV_MAX_DECOMPRESSED_BYTES = int(os.getenv("CV_MAX_DECOMPRESSED_BYTES", 50 * 1024 * 1024))
+CV_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("CV_EXTRACT_TIMEOUT_SECONDS", 30))
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# Bump whenever SCREENING_PROMPT or the prompt text preparation changes so
+# cached analyses are not reused
+PROMPT_VERSION = "2"
+AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", 1))
+
+SCREENING_PROMPT = (
+    "You are an expert CV screener. Given the resume text below, "
+    "identify the most relevant job roles (3-5), summarize key skills, "
+    "and suggest improvements. Return a JSON with these fields: "
+    "roles (array of strings), skills (array of strings), summary (string), "
+    "and improvements (array of strings)."
+)
+
+
+class ScreeningError(Exception):
+    """A screening step failed; the message is safe to show to the user.
+
+    ``retryable=False`` marks failures that would fail the same way on
+    every attempt (bad input, limits, configuration), so workers fail the
+    screening right away instead of requeueing it.
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+    def __reduce__(self):
+        # Raised inside extraction worker processes; keep the flag across pickling
+        return type(self), (str(self), self.retryable)
+
+
+def storage_key(storage_url: str) -> str:
+    storage_url_parts = storage_url.split(f"{STORAGE_BUCKET}/")
+    if len(storage_url_parts) != 2:
+        raise ScreeningError("Invalid storage URL format", retryable=False)
+    return storage_url_parts[1]
+
+
+def head_cv_etag(storage_url: str) -> Optional[str]:
+    """ETag of the stored object, or None if storage does not report one."""
+    try:
+        head = s3_client.head_object(Bucket=STORAGE_BUCKET, Key=storage_key(storage_url))
+    except ClientError as e:
+        raise ScreeningError(f"Failed to read CV file from storage: {str(e)}")
+    etag = (head.get("ETag") or "").strip('"')
+    return etag or None
+
+
+def download_cv(storage_url: str) -> tuple[IO[bytes], str]:
+    """Stream the object into a named temp file.
+
+    Returns the file (positioned at 0; closing it deletes it) and the
+    SHA-256 of its bytes. Reads in chunks so the file is never held in
+    memory, and is named so extraction workers can open it by path.
+    """
+    spool = tempfile.NamedTemporaryFile(prefix="cv-")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        body = s3_client.get_object(Bucket=STORAGE_BUCKET, Key=storage_key(storage_url))["Body"]
+        for chunk in body.iter_chunks(DOWNLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > CV_MAX_DOWNLOAD_BYTES:
+                raise ScreeningError("CV file is too large", retryable=False)
+            digest.update(chunk)
+            spool.write(chunk)
+    except ScreeningError:
+        spool.close()
+        raise
+    except Exception as e:
+        spool.close()
+        raise ScreeningError(f"Failed to read CV file from storage: {str(e)}")
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+def normalize_text(text_content: str) -> str:
+    normalized = re.sub(r"[ \t]+", " ", text_content)
+    return re.sub(r"\s*\n\s*", "\n", normalized).strip()
+
+
+def _check_deadline(deadline: float) -> None:
+    if time.monotonic() > deadline:
+        raise ScreeningError("CV text extraction timed out")
+
+
+def _inflated_size(data: bytes, limit: int) -> int:
+    # Inflates chunk by chunk, keeping nothing, and stops once past limit
+    inflater = zlib.decompressobj()
+    size = 0
+    while size <= limit:
+        chunk = inflater.decompress(data, DOWNLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        data = inflater.unconsumed_tail
+    return size
+
+
+def _decoded_size(stream, limit: int) -> int:
+    """Size of a PDF stream once decoded; more than ``limit`` means too large.
+
+    Decodes the filter chain itself rather than calling get_data(), so
+    FlateDecode is never inflated past ``limit``. Only the filters content
+    streams use in practice are supported (the ASCII ones, then at most a
+    final FlateDecode); anything else is rejected.
+    """
+    data = stream._data
+    filters = stream.get("/Filter") or []
+    filters = [filters] if isinstance(filters, str) else list(filters)
+    for position, name in enumerate(filters, 1):
+        if name in ("/FlateDecode", "/Fl") and position == len(filters):
+            return _inflated_size(data, limit)
+        elif name in ("/ASCIIHexDecode", "/AHx"):
+            hex_digits = re.sub(rb"\s", b"", data.split(b">", 1)[0])
+            data = bytes.fromhex((hex_digits + b"0" * (len(hex_digits) % 2)).decode("ascii"))
+        elif name in ("/ASCII85Decode", "/A85"):
+            data = base64.a85decode(re.sub(rb"\s", b"", data).removeprefix(b"<~").split(b"~>", 1)[0])
+        else:
+            raise ScreeningError(f"CV uses an unsupported PDF filter {name}", retryable=False)
+        if len(data) > limit:
+            return limit + 1
+    return len(data)
+
+
+def _iter_pdf_pages(file_obj: IO[bytes], deadline: float) -> Iterator[str]:
+    """Yield the text of the first CV_MAX_PAGES pages; later pages are ignored."""
+    # Parse straight from a memory map of the file instead of copying it
+    with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        pdf = PdfReader(mapped)
+        decompressed = 0
+        for page in islice(pdf.pages, CV_MAX_PAGES):
+            _check_deadline(deadline)
+            contents = page.get("/Contents")
+            contents = contents.get_object() if contents is not None else ArrayObject()
+            # Sized before extract_text() decodes them
+            for stream in contents if isinstance(contents, ArrayObject) else [contents]:
+                decompressed += _decoded_size(stream.get_object(), CV_MAX_DECOMPRESSED_BYTES - decompressed)
+                if decompressed > CV_MAX_DECOMPRESSED_BYTES:
+                    raise ScreeningError("CV file is too large once decompressed", retryable=False)
+            yield page.extract_text() or ""
+
+
+def _iter_docx_paragraphs(file_obj: IO[bytes], deadline: float) -> Iterator[str]:
+    # Check declared sizes before python-docx inflates anything (zip bombs)
+    with zipfile.ZipFile(file_obj) as archive:
+        if sum(info.file_size for info in archive.infolist()) > CV_MAX_DECOMPRESSED_BYTES:
+            raise ScreeningError("CV file is too large once decompressed", retryable=False)
+    file_obj.seek(0)
+    doc = Document(file_obj)
+    for paragraph in doc.paragraphs:
+        _check_deadline(deadline)
+        yield paragraph.text
+
+
+def _iter_text_chunks(file_obj: IO[bytes], deadline: float) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    while chunk := file_obj.read(DOWNLOAD_CHUNK_BYTES):
+        _check_deadline(deadline)
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_cv_text(filename: str, file_obj: IO[bytes], deadline: float) -> Iterator[str]:
+    """Lazily yield text pieces (pages, paragraphs or chunks) of a CV file."""
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return _iter_pdf_pages(file_obj, deadline)
+    elif name.endswith('.docx'):
+        return _iter_docx_paragraphs(file_obj, deadline)
+    return _iter_text_chunks(file_obj, deadline)
+
+
+def extract_cv_text(filename: str, file_obj: IO[bytes], char_budget: int = EXTRACT_CHAR_BUDGET) -> tuple[str, Optional[int]]:
+    """Return the CV text and the number of pages read (None for formats without pages).
+
+    Stops as soon as ``char_budget`` normalized characters have been
+    collected, so later pages of a long CV are never parsed.
+    """
+    deadline = time.monotonic() + CV_EXTRACT_TIMEOUT_SECONDS
+    pieces = []
+    collected = 0
+    try:
+        for piece in iter_cv_text(filename, file_obj, deadline):
+            pieces.append(piece)
+            collected += len(normalize_text(piece))
+            if collected >= char_budget:
+                break
+    except ScreeningError:
+        raise
+    except Exception as e:
+        raise ScreeningError(f"Failed to read CV file: {str(e)}", retryable=False)
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        # Page breaks let compaction spot repeated headers and footers
+        return PAGE_BREAK.join(pieces), len(pieces)
+    elif name.endswith('.docx'):
+        return "\n".join(pieces), None
+    return "".join(pieces), None
+
+
+def extract_cv_file(filename: str, path: str) -> tuple[str, Optional[int]]:
+    """extract_cv_text for a file on disk; runs in extraction worker processes."""
+    with open(path, "rb") as file_obj:
+        return extract_cv_text(filename, file_obj)
+
+
+def models_chat_url() -> str:
+    # base "https://models.github.ai/inference" or full "https://models.github.ai/inference/chat/completions"
+    endpoint = os.getenv(
+        "GITHUB_MODELS_ENDPOINT",
+        "https://models.github.ai/inference/chat/completions",
+    )
+    return endpoint if endpoint.rstrip("/").endswith("chat/completions") else f"{endpoint.rstrip('/')}/chat/completions"
+
+
+def ai_model() -> str:
+    return os.getenv("AI_MODEL", "openai/gpt-4.1") or "openai/gpt-4.1"
+
+
+def prompt_text(text_content: str) -> str:
+    """The CV text exactly as it is sent to the model."""
+    return compact_cv_text(text_content, PROMPT_TOKEN_BUDGET)
+
+
+def analysis_cache_key(text_content: str) -> tuple[str, str, str, float]:
+    """(text hash, model, prompt version, temperature) for the analysis cache."""
+    text_hash = hashlib.sha256(prompt_text(text_content).encode("utf-8")).hexdigest()
+    return text_hash, ai_model(), PROMPT_VERSION, AI_TEMPERATURE
+
+
+def build_analysis_request(text_content: str) -> tuple[str, dict, dict]:
+    github_token = os.getenv("GITHUB_TOKEN")
+    if not github_token:
+        raise ScreeningError("GITHUB_TOKEN is not configured for GitHub Models", retryable=False)
+    cv_text = prompt_text(text_content)
+    if not cv_text:
+        raise ScreeningError("No readable text was found in the CV", retryable=False)
+
+    payload = {
+        "model": ai_model(),
+        "messages": [
+            {"role": "system", "content": SCREENING_PROMPT},
+            {"role": "user", "content": cv_text},
+        ],
+        "temperature": AI_TEMPERATURE,
+        "top_p": 1,
+    }
+    # Use minimal headers like the GitHub Models quickstart
+    headers = {
+        "Authorization": f"Bearer {github_token}",
+        "Content-Type": "application/json",
+    }
+    return models_chat_url(), headers, payload
+
+
+# Generation can take far longer than the default outbound read timeout
+ANALYSIS_TIMEOUT = httpx.Timeout(120, connect=10)
+
+
+async def analyze_cv_text(text_content: str) -> str:
+    url, headers, payload = build_analysis_request(text_content)
+    try:
+        r = await get_http_client().post(url, headers=headers, json=payload, timeout=ANALYSIS_TIMEOUT)
+        r.raise_for_status()
+        data = r.json()
+    except Exception as e:
+        raise ScreeningError(f"AI analysis failed: {str(e)}")
+    return (
+        data.get("choices", [{}])[0]
+        .get("message", {})
+        .get("content", "")
+    )
+
+
+async def stream_analysis(text_content: str) -> AsyncIterator[str]:
+    """Yield the analysis in content deltas as the model generates it."""
+    url, headers, payload = build_analysis_request(text_content)
+    try:
+        stream = get_http_client().stream(
+            "POST", url, headers=headers, json={**payload, "stream": True}, timeout=ANALYSIS_TIMEOUT,
+        )
+        async with stream as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+    except Exception as e:
+        raise ScreeningError(f"AI analysis failed: {str(e)}")
+
+
+def parse_analysis(analysis: str) -> ScreeningResult:
+    """Validate the model's JSON answer, tolerating code fences and surrounding prose."""
+    start, end = analysis.find("{"), analysis.rfind("}")
+    if start == -1 or end < start:
+        raise ScreeningError("AI analysis did not contain a JSON result")
+    try:
+        return ScreeningResult.model_validate_json(analysis[start:end + 1])
+    except ValidationError as e:
+        raise ScreeningError(f"AI analysis was not a valid result: {e.error_count()} error(s)")
+
@@ -0,0 +1,271 @@
+"""Postgres-backed job queue for CV screenings.
+
+Screenings are enqueued as rows in ``pending``. Workers claim the oldest
+one with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of workers,
+in this process or in ``python -m app.services.screening_worker``, can
+drain the queue without double-processing a row.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import Select, select, update, func, or_
+from sqlalchemy.orm import aliased
+from app.database import AsyncSessionLocal
+from app.http_client import close_http_client
+from app.models.cv_model import CV
+from app.models.screening_model import Screening
+from app.models.screening_batch_model import ScreeningBatch
+from app.services.activity_stream import record_activity
+from app.schemas.screening_schemas import ScreeningResult
+from app.services.analysis_cache import cached_analysis
+from app.services.persona import merge_screening_result
+from app.services.cv_text import get_cv_text
+from app.services.screening_pipeline import ScreeningError, parse_analysis
+from app.services.wallet_ledger import capture, refund, release
+
+logger = logging.getLogger(__name__)
+
+SCREENING_WORKERS = int(os.getenv("SCREENING_WORKERS", 2))
+SCREENING_POLL_INTERVAL_SECONDS = float(os.getenv("SCREENING_POLL_INTERVAL_SECONDS", 2))
+SCREENING_MAX_ATTEMPTS = int(os.getenv("SCREENING_MAX_ATTEMPTS", 3))
+# A failed attempt waits this long before it can be claimed again, doubling on each retry
+SCREENING_RETRY_DELAY_SECONDS = float(os.getenv("SCREENING_RETRY_DELAY_SECONDS", 30))
+# A running row older than this is assumed to belong to a dead worker
+SCREENING_STALE_AFTER_SECONDS = int(os.getenv("SCREENING_STALE_AFTER_SECONDS", 600))
+# Items of one bulk batch running at once, so a large batch cannot starve other screenings
+SCREENING_BATCH_CONCURRENCY = int(os.getenv("SCREENING_BATCH_CONCURRENCY", 4))
+
+
+def next_pending_screening_stmt() -> Select:
+    sibling = aliased(Screening)
+    running_in_batch = (
+        select(func.count())
+        .select_from(sibling)
+        .where(sibling.batch_id == Screening.batch_id, sibling.status == "running")
+        .scalar_subquery()
+    )
+    return (
+        select(Screening)
+        .where(Screening.status == "pending")
+        .where(or_(Screening.run_after.is_(None), Screening.run_after <= func.now()))
+        .where(or_(Screening.batch_id.is_(None), running_in_batch < SCREENING_BATCH_CONCURRENCY))
+        .order_by(Screening.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def claim_next_screening() -> Optional[tuple[int, int]]:
+    """Claim the oldest runnable screening; returns its id and attempt number."""
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            screening = await session.scalar(next_pending_screening_stmt())
+            if not screening:
+                return None
+            screening.status = "running"
+            screening.progress = "extracting"
+            screening.attempts += 1
+            screening.started_at = datetime.now(timezone.utc)
+            return screening.id, screening.attempts
+
+
+async def set_progress(screening_id: int, progress: str, attempt: Optional[int] = None) -> None:
+    stmt = update(Screening).where(Screening.id == screening_id, Screening.status == "running")
+    if attempt is not None:
+        stmt = stmt.where(Screening.attempts == attempt)
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt.values(progress=progress))
+        await session.commit()
+
+
+async def finish_screening(
+    screening_id: int,
+    analysis: Optional[str] = None,
+    result: Optional[ScreeningResult] = None,
+    error: Optional[str] = None,
+    retry: bool = True,
+    attempt: Optional[int] = None,
+) -> bool:
+    """Record the outcome of a running screening and settle its credit.
+
+    Returns False, changing nothing, when the row is no longer running
+    (finished already) or, with ``attempt``, has since been requeued and
+    claimed again, so a repeated or late call cannot settle twice.
+    """
+    async with AsyncSessionLocal() as session:
+        screening = await session.get(Screening, screening_id, with_for_update=True)
+        if screening is None or screening.status != "running":
+            return False
+        if attempt is not None and screening.attempts != attempt:
+            return False
+        if error is not None and retry and screening.attempts < SCREENING_MAX_ATTEMPTS:
+            screening.status = "pending"
+            screening.progress = "queued"
+            screening.error = error
+            screening.run_after = datetime.now(timezone.utc) + timedelta(
+                seconds=SCREENING_RETRY_DELAY_SECONDS * 2 ** (screening.attempts - 1)
+            )
+            await session.commit()
+            return True
+
+        screening.status = "failed" if error is not None else "done"
+        screening.progress = None
+        screening.analysis = analysis
+        screening.result = result.model_dump() if result is not None else None
+        screening.error = error
+        screening.finished_at = datetime.now(timezone.utc)
+        if result is not None:
+            await merge_screening_result(session, screening.user_id, result, screening.id)
+        if screening.hold_id is not None:
+            if error is None:
+                await capture(session, screening.hold_id, screening.credits_used, external_ref=f"screening_{screening.id}")
+            else:
+                # Nothing was delivered, the held credit goes back to whoever paid
+                await release(session, screening.hold_id, screening.credits_used)
+        elif error is not None:
+            # Queued before credit holds: the credit was debited up front
+            payer_id = screening.user_id
+            if screening.batch_id is not None:
+                payer_id = await session.scalar(select(ScreeningBatch.user_id).where(ScreeningBatch.id == screening.batch_id))
+            await refund(session, payer_id, screening.credits_used, external_ref=f"screening_{screening.id}")
+        record_activity(session, screening.user_id, kind="screening", message=f"CV screening {screening.status}", ref_id=str(screening.id))
+        await session.commit()
+        return True
+
+
+async def process_screening(screening_id: int, attempt: Optional[int] = None) -> None:
+    try:
+        # No connection is held across the download, extraction or model call
+        async with AsyncSessionLocal() as session:
+            screening = await session.get(Screening, screening_id)
+            cv = await session.get(CV, screening.cv_id)
+        if not cv:
+            raise ScreeningError("CV not found", retryable=False)
+        # Reuses stored text unless the object or extractor changed
+        text_content = (await get_cv_text(cv)).text
+
+        await set_progress(screening_id, "analyzing", attempt)
+        analysis = await cached_analysis(text_content, bypass=screening.bypass_cache)
+        result = parse_analysis(analysis)
+    except ScreeningError as e:
+        await finish_screening(screening_id, error=str(e), retry=e.retryable, attempt=attempt)
+        return
+    except Exception as e:
+        logger.exception("Screening %s failed", screening_id)
+        await finish_screening(screening_id, error=f"Failed to run screening: {str(e)}", attempt=attempt)
+        return
+    await finish_screening(screening_id, analysis=analysis, result=result, attempt=attempt)
+
+
+async def requeue_screening(screening_id: int) -> None:
+    """Hand a screening that was being run inline back to the workers."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Screening)
+            .where(Screening.id == screening_id, Screening.status == "running")
+            .values(status="pending", progress="queued")
+        )
+        await session.commit()
+
+
+async def requeue_stale_screenings() -> int:
+    """Return rows stuck in ``running`` after a worker crash to the queue.
+
+    Rows that already used every attempt are failed instead, releasing
+    their credit, so a job that keeps killing its worker cannot loop.
+    A worker still busy with a requeued row finds its attempt superseded
+    and finish_screening ignores it.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=SCREENING_STALE_AFTER_SECONDS)
+    stale = (Screening.status == "running", Screening.started_at < cutoff)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Screening)
+            .where(*stale, Screening.attempts < SCREENING_MAX_ATTEMPTS)
+            .values(status="pending", progress="queued")
+        )
+        exhausted = (await session.scalars(
+            select(Screening.id).where(*stale, Screening.attempts >= SCREENING_MAX_ATTEMPTS)
+        )).all()
+        await session.commit()
+    for screening_id in exhausted:
+        await finish_screening(screening_id, error="Screening did not finish in time", retry=False)
+    return result.rowcount + len(exhausted)
+
+
+class ScreeningWorkerPool:
+    def __init__(self, workers: int = SCREENING_WORKERS, poll_interval: float = SCREENING_POLL_INTERVAL_SECONDS):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    def notify(self) -> None:
+        """Wake idle workers right away instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _run_worker(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await claim_next_screening()
+            except Exception:
+                logger.exception("Failed to claim screening")
+                claimed = None
+            if claimed is not None:
+                try:
+                    await process_screening(*claimed)
+                except Exception:
+                    # Most likely finish_screening could not reach the database;
+                    # the row stays running and the stale reaper requeues it
+                    logger.exception("Worker failed on screening %s", claimed[0])
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reap_stale(self) -> None:
+        while not self._stopping:
+            try:
+                requeued = await requeue_stale_screenings()
+                if requeued:
+                    logger.warning("Requeued or failed %s stale screening(s)", requeued)
+                    self.notify()
+            except Exception:
+                logger.exception("Failed to requeue stale screenings")
+            await asyncio.sleep(SCREENING_STALE_AFTER_SECONDS / 2)
+
+    def start(self) -> None:
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._run_worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reap_stale()))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+screening_workers = ScreeningWorkerPool()
+
+
+async def run_forever() -> None:
+    pool = ScreeningWorkerPool()
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_forever())
@@ -0,0 +1,131 @@
+"""In-memory access token revocation.
+
+Revoked token ids (``jti``) are written to ``revoked_tokens`` and every
+API process mirrors that table in memory: a Bloom filter answers the
+common "not revoked" case with a few hash probes, and only its
+(rare) positives are confirmed against an exact dict. Each process
+pulls rows newer than the last id it has seen every
+TOKEN_REVOCATION_SYNC_SECONDS, so a revocation made by one worker is
+honoured by the others within that interval and get_curr_user never
+queries the database for it.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.revoked_token_model import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", 5))
+# Revocations expected to be live at once; the filter is rebuilt larger if exceeded
+TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", 100000))
+TOKEN_REVOCATION_BLOOM_ERROR_RATE = 0.001
+TOKEN_REVOCATION_SWEEP_SECONDS = 3600
+# Ids are assigned at insert but become visible at commit, so each sync
+# re-reads a short tail in case a lower id committed late
+TOKEN_REVOCATION_SYNC_OVERLAP_IDS = 256
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = TOKEN_REVOCATION_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocations:
+    def __init__(self, capacity: int = TOKEN_REVOCATION_BLOOM_CAPACITY):
+        self._bloom = BloomFilter(capacity)
+        # jti -> token exp (unix seconds)
+        self._revoked: dict[str, float] = {}
+        self._last_id = 0
+        self._last_sweep = 0.0
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires = self._revoked.get(jti)
+        return expires is not None and expires > time.time()
+
+    def _add(self, jti: str, expires: float) -> None:
+        self._revoked[jti] = expires
+        self._bloom.add(jti)
+
+    def _rebuild(self) -> None:
+        """Drop expired ids; a Bloom filter cannot forget, so it is rebuilt."""
+        now = time.time()
+        self._revoked = {jti: expires for jti, expires in self._revoked.items() if expires > now}
+        capacity = self._bloom.capacity
+        while len(self._revoked) > capacity:
+            capacity *= 2
+        bloom = BloomFilter(capacity)
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    async def revoke(self, session: AsyncSession, jti: str, expires_at: datetime, user_id: Optional[int] = None) -> None:
+        """Record a revocation (the caller commits) and apply it locally right away."""
+        await session.execute(
+            insert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        self._add(jti, expires_at.timestamp())
+
+    async def sync(self) -> int:
+        """Load revocations added by any process since the last sync."""
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(
+                    RevokedToken.id > self._last_id - TOKEN_REVOCATION_SYNC_OVERLAP_IDS,
+                    RevokedToken.expires_at > datetime.now(timezone.utc),
+                )
+                .order_by(RevokedToken.id)
+            )).all()
+            if time.monotonic() - self._last_sweep > TOKEN_REVOCATION_SWEEP_SECONDS:
+                self._last_sweep = time.monotonic()
+                await session.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.now(timezone.utc)))
+                await session.commit()
+                self._rebuild()
+        for row in rows:
+            self._add(row.jti, row.expires_at.timestamp())
+            self._last_id = max(self._last_id, row.id)
+        if len(self._revoked) > self._bloom.capacity:
+            self._rebuild()
+        return len(rows)
+
+    async def sync_forever(self, interval: float = TOKEN_REVOCATION_SYNC_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync token revocations")
+
+
+token_revocations = TokenRevocations()
@@ -0,0 +1,44 @@
+"""Per-user row counts for list totals.
+
+Every insert or delete of a counted row bumps the owner's counter in the
+same database transaction, so listing endpoints read one primary-key
+row instead of running COUNT(*) over the user's rows.
+"""
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_counter_model import UserCounter
+
+
+def _add_on_conflict(stmt: Insert) -> Insert:
+    # onupdate does not fire through ON CONFLICT, so updated_at is set here
+    return stmt.on_conflict_do_update(
+        index_elements=[UserCounter.user_id],
+        set_={
+            "cv_count": UserCounter.cv_count + stmt.excluded.cv_count,
+            "transaction_count": UserCounter.transaction_count + stmt.excluded.transaction_count,
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def bump_counters(session: AsyncSession, user_id: int, cvs: int = 0, transactions: int = 0) -> None:
+    await session.execute(_add_on_conflict(
+        insert(UserCounter).values(user_id=user_id, cv_count=cvs, transaction_count=transactions)
+    ))
+
+
+def bump_counters_from(user_id, cvs: int = 0, transactions: int = 0) -> Insert:
+    """bump_counters as INSERT ... SELECT over ``user_id`` (a column of another
+    CTE), so it can run as a CTE inside a larger single statement."""
+    return _add_on_conflict(
+        insert(UserCounter).from_select(
+            ["user_id", "cv_count", "transaction_count"],
+            select(user_id, literal(cvs), literal(transactions)),
+        )
+    )
+
+
+async def get_counters(session: AsyncSession, user_id: int) -> UserCounter:
+    counters = await session.scalar(select(UserCounter).where(UserCounter.user_id == user_id))
+    return counters or UserCounter(user_id=user_id, cv_count=0, transaction_count=0)
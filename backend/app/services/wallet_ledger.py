@@ -0,0 +1,291 @@
+"""Wallet ledger: atomic credit debits, refunds and purchases.
+
+A debit is a single statement: a conditional ``UPDATE wallets ... WHERE
+balance_credits >= :n RETURNING`` feeding the INSERT of its transactions
+row, run in the caller's database transaction. Postgres serializes
+concurrent debits on the wallet row only from that statement to commit,
+the balance can never go negative, and nothing is held across slow
+provider calls: if the downstream work fails the caller refunds instead.
+Callers should debit as the last write before committing.
+
+For work that finishes later (queued screenings, provider calls) credits
+are held instead: place_hold takes them from the balance the same way
+and records a credit_holds row. capture then only touches the hold and
+the ledger, and release (or expiry, swept by sweep_expired_holds)
+returns what is left to the wallet. The wallet row is not locked or
+rewritten while the slow work runs.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from decimal import Decimal
+from sqlalchemy import DateTime, Numeric, String, case, func, insert, literal, null, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.credit_hold_model import CreditHold
+from app.models.transaction_model import Transaction
+from app.models.user_counter_model import UserCounter
+from app.models.wallet_model import Wallet
+from app.services.activity_stream import record_activity, record_transaction_activity
+from app.services.user_counters import bump_counters, bump_counters_from
+
+logger = logging.getLogger(__name__)
+
+CREDIT_HOLD_TTL_SECONDS = int(os.getenv("CREDIT_HOLD_TTL_SECONDS", 900))
+CREDIT_HOLD_SWEEP_INTERVAL_SECONDS = int(os.getenv("CREDIT_HOLD_SWEEP_INTERVAL_SECONDS", 60))
+CREDIT_HOLD_SWEEP_BATCH = 500
+
+
+class InsufficientCredits(Exception):
+    """The wallet does not exist or holds fewer credits than requested."""
+
+
+async def _apply(
+    session: AsyncSession,
+    user_id: int,
+    type: str,
+    credits: int,
+    external_ref: Optional[str],
+    payment_gateway: str,
+    amount_inr: Optional[Decimal] = None,
+) -> Optional[int]:
+    """Move the balance, insert the ledger row and count it in one statement.
+
+    Returns the new balance, or None (and writes nothing) when a debit
+    would overdraw the wallet or the wallet does not exist.
+    """
+    delta = -credits if type == "deduct" else credits
+    wallet_update = (
+        update(Wallet)
+        .where(Wallet.user_id == user_id)
+        .values(balance_credits=Wallet.balance_credits + delta)
+        .returning(Wallet.user_id, Wallet.balance_credits)
+    )
+    if delta < 0:
+        wallet_update = wallet_update.where(Wallet.balance_credits >= credits)
+    wallet_update = wallet_update.cte("wallet_update")
+    ledger_entry = (
+        insert(Transaction)
+        .from_select(
+            ["user_id", "type", "credits", "amount_inr", "currency", "payment_gateway", "external_ref", "status"],
+            select(
+                wallet_update.c.user_id,
+                literal(type, String),
+                literal(credits),
+                literal(amount_inr, Numeric(10, 2)) if amount_inr is not None else null(),
+                literal("INR", String),
+                literal(payment_gateway, String),
+                literal(external_ref, String),
+                literal("success", String),
+            ),
+        )
+        .returning(Transaction.id, Transaction.user_id)
+        .cte("ledger_entry")
+    )
+    counter_bump = (
+        bump_counters_from(ledger_entry.c.user_id, transactions=1)
+        .returning(UserCounter.user_id)
+        .cte("counter_bump")
+    )
+    row = (await session.execute(
+        select(wallet_update.c.balance_credits, ledger_entry.c.id)
+        .join_from(wallet_update, ledger_entry, ledger_entry.c.user_id == wallet_update.c.user_id)
+        .join(counter_bump, counter_bump.c.user_id == ledger_entry.c.user_id)
+    )).first()
+    if row is None:
+        return None
+    record_activity(
+        session, user_id, kind=f"transaction_{type}", message=f"{type.capitalize()} {credits} credits", ref_id=str(row.id)
+    )
+    return row.balance_credits
+
+
+async def debit(
+    session: AsyncSession,
+    user_id: int,
+    credits: int,
+    external_ref: Optional[str] = None,
+    payment_gateway: str = "credits",
+) -> int:
+    """Take ``credits`` from the wallet and return the new balance.
+
+    Raises InsufficientCredits without changing anything when the balance
+    is too low. The caller commits (or rolls back) the session.
+    """
+    balance = await _apply(session, user_id, "deduct", credits, external_ref, payment_gateway)
+    if balance is None:
+        raise InsufficientCredits()
+    return balance
+
+
+async def refund(
+    session: AsyncSession,
+    user_id: int,
+    credits: int,
+    external_ref: Optional[str] = None,
+    payment_gateway: str = "credits",
+) -> Optional[int]:
+    """Give back credits for work that was not delivered; returns the new balance."""
+    return await _apply(session, user_id, "refund", credits, external_ref, payment_gateway)
+
+
+async def purchase(
+    session: AsyncSession,
+    user_id: int,
+    credits: int,
+    amount_inr: Decimal,
+    external_ref: str,
+    payment_gateway: str = "credit_pack",
+) -> Optional[int]:
+    """Add bought credits to the wallet; returns the new balance, or None if there is no wallet."""
+    return await _apply(session, user_id, "purchase", credits, external_ref, payment_gateway, amount_inr)
+
+
+
+def _held(hold=CreditHold):
+    return hold.credits - hold.captured_credits - hold.released_credits
+
+
+async def place_hold(
+    session: AsyncSession,
+    user_id: int,
+    credits: int,
+    external_ref: Optional[str] = None,
+    payment_gateway: str = "credits",
+    ttl_seconds: int = CREDIT_HOLD_TTL_SECONDS,
+) -> int:
+    """Reserve credits for work that settles later and return the hold id.
+
+    Like debit, one statement and the caller commits; raises
+    InsufficientCredits when the balance is too low.
+    """
+    wallet_update = (
+        update(Wallet)
+        .where(Wallet.user_id == user_id, Wallet.balance_credits >= credits)
+        .values(balance_credits=Wallet.balance_credits - credits)
+        .returning(Wallet.user_id)
+        .cte("wallet_update")
+    )
+    new_hold = (
+        insert(CreditHold)
+        .from_select(
+            ["user_id", "credits", "captured_credits", "released_credits", "status", "external_ref", "payment_gateway", "expires_at"],
+            select(
+                wallet_update.c.user_id,
+                literal(credits),
+                literal(0),
+                literal(0),
+                literal("held", String),
+                literal(external_ref, String),
+                literal(payment_gateway, String),
+                literal(datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds), DateTime(timezone=True)),
+            ),
+        )
+        .returning(CreditHold.id)
+        .cte("new_hold")
+    )
+    hold_id = await session.scalar(select(new_hold.c.id))
+    if hold_id is None:
+        raise InsufficientCredits()
+    return hold_id
+
+
+async def _settle(
+    session: AsyncSession, hold_id: int, captured: int = 0, released: int = 0, closed_status: str = "settled"
+):
+    """Move credits out of an open hold; returns the hold row or None if it is not open."""
+    remaining = _held() - captured - released
+    return (await session.execute(
+        update(CreditHold)
+        .where(CreditHold.id == hold_id, CreditHold.status == "held", _held() >= captured + released)
+        .values(
+            captured_credits=CreditHold.captured_credits + captured,
+            released_credits=CreditHold.released_credits + released,
+            status=case((remaining == 0, closed_status), else_=CreditHold.status),
+            settled_at=case((remaining == 0, func.now()), else_=CreditHold.settled_at),
+        )
+        .returning(CreditHold.user_id, CreditHold.payment_gateway)
+    )).first()
+
+
+async def capture(session: AsyncSession, hold_id: int, credits: int, external_ref: Optional[str] = None) -> None:
+    """Charge held credits for delivered work: a ledger entry, no wallet write.
+
+    If the hold already expired (its credits went back to the wallet),
+    the credits are debited from the wallet instead when it can cover them.
+    A hold that was already settled is left alone, so a repeated capture
+    never charges twice.
+    """
+    hold = await _settle(session, hold_id, captured=credits)
+    if hold is not None:
+        transaction = Transaction(
+            user_id=hold.user_id,
+            type="deduct",
+            credits=credits,
+            amount_inr=None,
+            currency="INR",
+            payment_gateway=hold.payment_gateway,
+            external_ref=external_ref,
+            status="success",
+        )
+        session.add(transaction)
+        await session.flush()
+        record_transaction_activity(session, transaction)
+        await bump_counters(session, hold.user_id, transactions=1)
+        return
+
+    expired = (await session.execute(
+        select(CreditHold.user_id, CreditHold.payment_gateway).where(CreditHold.id == hold_id, CreditHold.status == "expired")
+    )).first()
+    if expired is None:
+        return
+    try:
+        await debit(session, expired.user_id, credits, external_ref, expired.payment_gateway)
+    except InsufficientCredits:
+        logger.warning("Hold %s expired before capture and the wallet cannot cover %s credit(s)", hold_id, credits)
+
+
+async def release(session: AsyncSession, hold_id: int, credits: int, closed_status: str = "settled") -> None:
+    """Return held credits for work that was not delivered; no-op once the hold is closed."""
+    hold = await _settle(session, hold_id, released=credits, closed_status=closed_status)
+    if hold is not None:
+        await session.execute(
+            update(Wallet)
+            .where(Wallet.user_id == hold.user_id)
+            .values(balance_credits=Wallet.balance_credits + credits)
+        )
+
+
+async def held_credits(session: AsyncSession, user_id: int) -> int:
+    return await session.scalar(
+        select(func.coalesce(func.sum(_held()), 0)).where(CreditHold.user_id == user_id, CreditHold.status == "held")
+    )
+
+
+async def sweep_expired_holds() -> int:
+    """Release whatever is still held by holds past their expiry."""
+    async with AsyncSessionLocal() as session:
+        expired = (await session.execute(
+            select(CreditHold.id, _held().label("held"))
+            .where(CreditHold.status == "held", CreditHold.expires_at < func.now())
+            .order_by(CreditHold.expires_at)
+            .limit(CREDIT_HOLD_SWEEP_BATCH)
+            .with_for_update(skip_locked=True)
+        )).all()
+        for hold in expired:
+            await release(session, hold.id, hold.held, closed_status="expired")
+        await session.commit()
+        return len(expired)
+
+
+async def sweep_holds_forever(interval: float = CREDIT_HOLD_SWEEP_INTERVAL_SECONDS) -> None:
+    while True:
+        try:
+            swept = await sweep_expired_holds()
+            if swept:
+                logger.info("Released %s expired credit hold(s)", swept)
+        except Exception:
+            logger.exception("Failed to sweep credit holds")
+        await asyncio.sleep(interval)
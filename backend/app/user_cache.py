@@ -0,0 +1,57 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from cachetools import TTLCache
+from app.models.user_model import User
+
+
+AUTH_USER_CACHE_TTL_SECONDS = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", 60))
+AUTH_USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", 10000))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Read-only snapshot of the authenticated user.
+
+    Handlers that need to change the users row must load it through their
+    own session; this object is shared between requests.
+    """
+    id: int
+    name: str
+    email: str
+    phone: Optional[str]
+    city: Optional[str]
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, name=user.name, email=user.email, phone=user.phone, city=user.city)
+
+
+class UserCache:
+    """Process-local TTL/LRU cache of resolved principals keyed by token subject."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[CurrentUser]:
+        with self._lock:
+            return self._entries.get(subject)
+
+    def put(self, user: User) -> CurrentUser:
+        principal = CurrentUser.from_model(user)
+        with self._lock:
+            self._entries[principal.email] = principal
+        return principal
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(maxsize=AUTH_USER_CACHE_MAX_SIZE, ttl=AUTH_USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,87 @@
+"""Stress the wallet ledger with concurrent debits against one wallet.
+
+Run from backend/ with ``python -m scripts.ledger_stress``. For each
+concurrency level a throwaway user gets ``--credits`` credits, twice as
+many one-credit debits race for them, and the run fails if any credit
+was spent twice. The user and its rows are deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from sqlalchemy import delete, func, select
+from app.database import AsyncSessionLocal, async_engine
+from app.models.activity_model import Activity
+from app.models.transaction_model import Transaction
+from app.models.user_counter_model import UserCounter
+from app.models.user_model import User
+from app.models.wallet_model import Wallet
+from app.services.wallet_ledger import InsufficientCredits, debit
+
+
+async def stress(credits: int, concurrency_levels: list[int]) -> bool:
+    async def attempt(user_id: int, latencies: list[float]) -> bool:
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as session:
+                try:
+                    await debit(session, user_id, 1, external_ref="stress")
+                except InsufficientCredits:
+                    return False
+                await session.commit()
+                return True
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    ok = True
+    for concurrency in concurrency_levels:
+        async with AsyncSessionLocal() as session:
+            user = User(name="Ledger stress", email=f"ledger-stress-{uuid.uuid4().hex[:8]}@example.invalid", password="!")
+            session.add(user)
+            await session.flush()
+            session.add(Wallet(user_id=user.id, balance_credits=credits))
+            await session.commit()
+            user_id = user.id
+
+        # Twice as many attempts as credits, `concurrency` in flight at a time
+        latencies: list[float] = []
+        gate = asyncio.Semaphore(concurrency)
+
+        async def limited() -> bool:
+            async with gate:
+                return await attempt(user_id, latencies)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(limited() for _ in range(credits * 2)))
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSessionLocal() as session:
+            balance = await session.scalar(select(Wallet.balance_credits).where(Wallet.user_id == user_id))
+            debits = await session.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id))
+            for model in (Activity, Transaction, UserCounter, Wallet):
+                await session.execute(delete(model).where(model.user_id == user_id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+        succeeded = sum(results)
+        consistent = succeeded == credits and balance == 0 and debits == succeeded
+        ok = ok and consistent
+        latencies.sort()
+        print(
+            f"concurrency={concurrency:4d} attempts={len(results)} debited={succeeded} balance={balance} "
+            f"ledger_rows={debits} p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms "
+            f"throughput={len(results) / elapsed:.0f}/s {'OK' if consistent else 'DOUBLE SPEND'}"
+        )
+    await async_engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--credits", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(stress(args.credits, args.concurrency)) else 1)
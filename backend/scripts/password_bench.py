@@ -0,0 +1,45 @@
+"""Measure bcrypt hashing throughput at the configured cost.
+
+Run from backend/ with ``python -m scripts.password_bench``. Reports
+hashes/sec on a single core and through a PasswordHashPool sized like the
+API's, so PASSWORD_HASH_WORKERS and BCRYPT_ROUNDS can be tuned together.
+"""
+import argparse
+import asyncio
+import time
+from app.auth import BCRYPT_ROUNDS, hash_password
+from app.services.password_pool import PASSWORD_HASH_WORKERS, PasswordHashPool
+
+
+def single_core(seconds: float) -> float:
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hash_password("benchmark-password")
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def through_pool(seconds: float) -> float:
+    pool = PasswordHashPool(max_pending=PASSWORD_HASH_WORKERS * 4)
+    await pool.hash("warm-up")
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        await asyncio.gather(*(pool.hash("benchmark-password") for _ in range(pool.max_pending)))
+        done += pool.max_pending
+    rate = done / (time.perf_counter() - start)
+    pool.shutdown()
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    print(f"bcrypt rounds={BCRYPT_ROUNDS}")
+    per_core = single_core(args.seconds)
+    print(f"single core: {per_core:.1f} hashes/s ({1000 / per_core:.1f} ms/hash)")
+    pooled = asyncio.run(through_pool(args.seconds))
+    print(
+        f"pool of {PASSWORD_HASH_WORKERS}: {pooled:.1f} hashes/s "
+        f"({pooled / max(PASSWORD_HASH_WORKERS, 1):.1f} per worker)"
+    )
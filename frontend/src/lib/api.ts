@@ -121,8 +121,9 @@ export const cvsAPI = {
   confirmUpload: (data: { filename: string; storage_filename: string; role_id?: number; size_bytes: number }) =>
     api.post('/api/v1/cvs/confirm', data),
 
-  getUserCVs: (skip = 0, limit = 10) =>
-    api.get(`/api/v1/cvs?skip=${skip}&limit=${limit}`),
+  // Pass the previous page's next_cursor to fetch the following page
+  getUserCVs: (limit = 10, cursor?: string) =>
+    api.get('/api/v1/cvs', { params: { limit, cursor } }),
 
   deleteCV: (cvId: number) =>
     api.delete(`/api/v1/cvs/${cvId}`),
@@ -134,8 +135,8 @@ export const cvsAPI = {
 // Payment & Wallet API
 export const walletAPI = {
   getWallet: () => api.get('/api/v1/wallet'),
-  getTransactions: (skip = 0, limit = 10) =>
-    api.get(`/api/v1/transactions?skip=${skip}&limit=${limit}`),
+  getTransactions: (limit = 10, cursor?: string) =>
+    api.get('/api/v1/transactions', { params: { limit, cursor } }),
   createPaymentOrder: (packId: number) => api.post('/api/v1/payments/order', { pack_id: packId }),
 }
 
@@ -149,6 +150,43 @@ export const interviewAPI = {
 export const screeningAPI = {
   runScreening: (cv_id: number) =>
     api.post('/api/v1/screenings/run', { cv_id }),
+  // Server-sent events: progress, token (analysis deltas), then done or error
+  streamScreening: async (
+    cv_id: number,
+    onEvent: (event: string, data: any) => void,
+    signal?: AbortSignal,
+  ) => {
+    const token = localStorage.getItem('access_token')
+    const response = await fetch(`${API_BASE_URL}/api/v1/screenings/run/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ cv_id }),
+      signal,
+    })
+    if (!response.ok || !response.body) {
+      const detail = await response.json().catch(() => null)
+      throw new Error(detail?.detail || 'Failed to start screening')
+    }
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        const event = block.match(/^event: (.*)$/m)?.[1] ?? 'message'
+        const data = block.match(/^data: (.*)$/m)?.[1]
+        if (data) onEvent(event, JSON.parse(data))
+      }
+    }
+  },
 }
 
 // Persona API (placeholder for future implementation)
@@ -1,6 +1,6 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { Button } from '@/components/ui/Button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/Card';
 import { Badge } from '@/components/ui/Badge';
@@ -49,6 +49,12 @@ const Screening = () => {
   const queryClient = useQueryClient();
   const [selectedCV, setSelectedCV] = useState<string>('');
   const [isStarting, setIsStarting] = useState(false);
+  const [streamProgress, setStreamProgress] = useState<string | null>(null);
+  const [streamedText, setStreamedText] = useState('');
+  const abortRef = useRef<AbortController | null>(null);
+
+  // Leaving the page drops the stream; the server hands the screening to a worker
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   const handleLogout = () => {
     setAuthToken(null);
@@ -70,25 +76,39 @@ const Screening = () => {
     refetchInterval: 30000, // Refresh every 30 seconds
   });
 
-  // Start screening mutation
-  const startScreeningMutation = useMutation({
-    mutationFn: (cv_id: number) => screeningAPI.runScreening(cv_id),
-    onSuccess: (response) => {
-      toast.success('CV Screening started successfully!');
-      // Immediately refresh wallet and CVs data
+  // Run the screening inline and show the analysis as the model writes it
+  const streamScreening = async (cv_id: number) => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    const started = { id: null as number | null };
+    setStreamedText('');
+    try {
+      await screeningAPI.streamScreening(cv_id, (event, data) => {
+        if (data?.id) started.id = data.id;
+        if (event === 'progress') {
+          setStreamProgress(data.progress);
+        } else if (event === 'token') {
+          setStreamedText((text) => text + data.content);
+        } else if (event === 'done') {
+          toast.success('CV Screening completed!');
+          navigate(`/screening/${data.id}`, { state: { analysis: data.result } });
+        } else if (event === 'error') {
+          toast.error(data.error || 'Screening failed');
+          navigate(`/screening/${data.id}`);
+        }
+      }, controller.signal);
+    } catch (error: any) {
+      if (controller.signal.aborted) return;
+      toast.error(error.message || 'Failed to start screening');
+      // The connection dropped mid-run; the result page polls until a worker finishes it
+      if (started.id) navigate(`/screening/${started.id}`);
+    } finally {
       queryClient.invalidateQueries({ queryKey: ['wallet'] });
       queryClient.invalidateQueries({ queryKey: ['userCVs'] });
       setIsStarting(false);
-      // Navigate to screening results if ID is available
-      if (response?.data?.id) {
-        navigate(`/screening/${response.data.id}`, { state: { analysis: response?.data?.analysis || null } });
-      }
-    },
-    onError: (error: any) => {
-      toast.error(error.response?.data?.detail || 'Failed to start screening');
-      setIsStarting(false);
+      setStreamProgress(null);
     }
-  });
+  };
 
   const handleStartScreening = () => {
     if (!selectedCV) {
@@ -102,7 +122,7 @@ const Screening = () => {
     }
 
     setIsStarting(true);
-    startScreeningMutation.mutate(parseInt(selectedCV));
+    streamScreening(parseInt(selectedCV));
   };
 
   const availableCVs = userCVs?.data?.cvs || [];
@@ -209,6 +229,23 @@ const Screening = () => {
               </CardContent>
             </Card>
 
+            {isStarting && (streamProgress || streamedText) && (
+              <Card className="mt-6">
+                <CardHeader>
+                  <CardTitle className="flex items-center">
+                    <Brain className="mr-2 h-5 w-5" />
+                    Live Analysis
+                  </CardTitle>
+                  <CardDescription>
+                    {streamProgress === 'extracting' ? 'Reading your CV...' : 'Analyzing your CV...'}
+                  </CardDescription>
+                </CardHeader>
+                <CardContent>
+                  <pre className="whitespace-pre-wrap text-sm text-gray-800 max-h-96 overflow-y-auto">{streamedText}</pre>
+                </CardContent>
+              </Card>
+            )}
+
             {/* Screening Features */}
             <Card className="mt-6">
               <CardHeader>
@@ -359,7 +396,7 @@ const Screening = () => {
                 {isStarting ? (
                   <>
                     <RefreshCw className="mr-2 h-5 w-5 animate-spin" />
-                    Starting Screening...
+                    Screening in progress...
                   </>
                 ) : (
                   <>
@@ -32,8 +32,14 @@ const ScreeningResult = () => {
             return res.data;
         },
         enabled: !!id && !passedAnalysis, // skip fetch if we already have analysis
+        // Screenings run in the background; poll until the worker finishes
+        refetchInterval: (query) => {
+            const status = (query.state.data as any)?.status;
+            return status === "pending" || status === "running" ? 2000 : false;
+        },
     });
 
+    const inProgress = !passedAnalysis && (screening?.status === "pending" || screening?.status === "running");
     const ai = parseAnalysis(passedAnalysis || screening?.analysis);
 
     return (
@@ -59,6 +65,16 @@ const ScreeningResult = () => {
                                         Failed to load screening result. Please try again.
                                     </AlertDescription>
                                 </Alert>
+                            ) : inProgress ? (
+                                <div className="py-12 text-center text-gray-600">
+                                    Analyzing your CV{screening?.progress ? ` (${screening.progress})` : ""}...
+                                </div>
+                            ) : screening?.status === "failed" ? (
+                                <Alert variant="destructive">
+                                    <AlertDescription>
+                                        {screening?.error || "Screening failed."} Your credit has been refunded.
+                                    </AlertDescription>
+                                </Alert>
                             ) : ai ? (
                                 <div className="space-y-6">
                                     {ai.summary && (
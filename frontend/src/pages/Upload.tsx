@@ -59,7 +59,7 @@ const Upload = () => {
   // Fetch user's CVs
   const { data: userCVs, isLoading: cvsLoading } = useQuery({
     queryKey: ['userCVs'],
-    queryFn: () => cvsAPI.getUserCVs(0, 10),
+    queryFn: () => cvsAPI.getUserCVs(10),
   });
 
   // Delete CV mutation
@@ -47,7 +47,7 @@ const Wallet = () => {
   // Fetch transactions
   const { data: transactions, isLoading: transactionsLoading } = useQuery({
     queryKey: ['transactions'],
-    queryFn: () => walletAPI.getTransactions(0, 20),
+    queryFn: () => walletAPI.getTransactions(20),
   });
 
   // Create payment order mutation
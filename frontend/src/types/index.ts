@@ -35,6 +35,7 @@ export interface CV {
 export interface Wallet {
   user_id: string
   balance_credits: number
+  held_credits?: number
   updated_at: string
 }
 